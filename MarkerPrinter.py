@@ -4,20 +4,43 @@
 #
 # Copyright (c) 2019, Josh Chien. All rights reserved.
 
-from argparse import ArgumentParser
-import numpy as np
-from PIL import Image
+import importlib
+import contextlib
+import hashlib
 import io
+import sys
 import warnings
 import os
-import cairo
-from cairosvg import svg2png
 import math
-import tempfile
-
-def SaveArucoDictBytesList(filePath = "arucoDictBytesList.npz"):
-    import numpy as np
-
+import collections
+import threading
+import json
+import csv
+import time
+import struct
+import zlib
+
+class LazyModule:
+
+    # Stand-in for a heavy dependency, the module is imported on first attribute access
+    def __init__(self, name):
+        self.moduleName = name
+        self.module = None
+
+    def __getattr__(self, attr):
+        if(self.module is None):
+            self.module = importlib.import_module(self.moduleName)
+        value = getattr(self.module, attr)
+        setattr(self, attr, value)
+        return value
+
+np = LazyModule("numpy")
+cairo = LazyModule("cairo")
+Image = LazyModule("PIL.Image")
+
+moduleDir = os.path.dirname(os.path.abspath(__file__))
+
+def SaveArucoDictBytesList(filePath = os.path.join(moduleDir, "arucoDictBytesList.npz")):
     # cv2 is optional dependency
     try:
         import cv2
@@ -51,25 +74,980 @@ def SaveArucoDictBytesList(filePath = "arucoDictBytesList.npz"):
 
     return None
 
+def SaveArucoDictBitsList(dirPath = os.path.join(moduleDir, "arucoDictBitsList")):
+    # Unpacked bit planes, one uncompressed .npy per dictionary so that they can be memory-mapped
+    try:
+        if not(os.path.isdir(dirPath)):
+            os.makedirs(dirPath)
+
+        arucoDictBitsList = {}
+        for name in MarkerPrinter.arucoDictMarkerSize:
+            arucoDictBits = MarkerPrinter.ArucoBitsTensor(name)
+
+            # Write to a temporary file first, so workers never map a partial file
+            filePath = os.path.join(dirPath, name + ".npy")
+            with open(filePath + ".tmp", "wb") as file:
+                np.save(file, arucoDictBits)
+            os.replace(filePath + ".tmp", filePath)
+
+            arucoDictBitsList[name] = arucoDictBits
+
+        return arucoDictBitsList
+
+    except Exception as e:
+        warnings.warn(str(e))
+        return None
+
+    return None
+
+def InitMarkerPrinterWorker(settings):
+    # Worker processes do not inherit class attributes under the spawn start method
+    for key, value in settings.items():
+        setattr(MarkerPrinter, key, value)
+
+def RunMarkerPrinterTask(name, *args):
+    # Runs MarkerPrinter.name in a worker process, unwrapped if the profiler was started before the fork
+    function = getattr(MarkerPrinter, name)
+    return getattr(function, "__wrapped__", function)(*args)
+
+class ArucoDictBytesList:
+
+    # Lazy view of arucoDictBytesList.npz, each dictionary is decompressed on first use and kept in memory
+    def __init__(self, filePath = os.path.join(moduleDir, "arucoDictBytesList.npz")):
+        self.filePath = filePath
+        self.source = None
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __Source(self):
+        if(self.source is None):
+            if (os.path.isfile(self.filePath)):
+                with ProfileStage("load"):
+                    self.source = np.load(self.filePath)
+            else:
+                warnings.warn("Missing build-in arucoDictBytesList.npz, generate it again")
+                self.source = SaveArucoDictBytesList(filePath = self.filePath)
+                if(self.source is None):
+                    self.source = {}
+        return self.source
+
+    def keys(self):
+        return self.__Source().keys()
+
+    def __contains__(self, dictionary):
+        return (dictionary in self.cache) or (dictionary in self.__Source())
+
+    def __getitem__(self, dictionary):
+        bytesList = self.cache.get(dictionary, None)
+        if(bytesList is not None):
+            self.hits = self.hits + 1
+            return bytesList
+
+        self.misses = self.misses + 1
+        with ProfileStage("load"):
+            bytesList = np.asarray(self.__Source()[dictionary])
+        self.cache[dictionary] = bytesList
+        return bytesList
+
+    def Stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loaded": list(self.cache.keys()) }
+
+    def Clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+class ArucoDictBitsList:
+
+    # Decoded bit tensors, memory-mapped from the precompiled store when available, decoded from the bytes list otherwise
+    def __init__(self, dirPath = os.path.join(moduleDir, "arucoDictBitsList")):
+        self.dirPath = dirPath
+        self.cache = {}
+        self.mapped = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, dictionary):
+        arucoDictBits = self.cache.get(dictionary, None)
+        if(arucoDictBits is not None):
+            self.hits = self.hits + 1
+            return arucoDictBits
+
+        self.misses = self.misses + 1
+        if(self.__Stored(dictionary)):
+            with ProfileStage("load"):
+                arucoDictBits = np.load(os.path.join(self.dirPath, dictionary + ".npy"), mmap_mode = "r")
+            self.mapped.add(dictionary)
+        else:
+            arucoDictBits = MarkerPrinter.ArucoBitsTensor(dictionary)
+        self.cache[dictionary] = arucoDictBits
+        return arucoDictBits
+
+    def __Stored(self, dictionary):
+        return (dictionary in MarkerPrinter.arucoDictMarkerSize) and os.path.isfile(os.path.join(self.dirPath, dictionary + ".npy"))
+
+    def __contains__(self, dictionary):
+        return (dictionary in self.cache) or self.__Stored(dictionary) or (dictionary in MarkerPrinter.arucoDictBytesList)
+
+    def MarkerCount(self, dictionary):
+        # Read from the store when there is one, the bytes list is only decompressed without it
+        if((dictionary in self.cache) or self.__Stored(dictionary)):
+            return self[dictionary].shape[0]
+        return MarkerPrinter.arucoDictBytesList[dictionary].shape[0]
+
+    def Stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loaded": list(self.cache.keys()),
+            "mapped": sorted(self.mapped) }
+
+    def Clear(self):
+        self.cache.clear()
+        self.mapped.clear()
+        self.hits = 0
+        self.misses = 0
+
+class LRUCache:
+
+    # Least recently used cache, capacity is counted in sizeOf(value) units, one unit per entry by default
+    def __init__(self, capacity = 1024, sizeOf = None):
+        self.capacity = capacity
+        self.sizeOf = sizeOf
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __EntrySize(self, value):
+        if(self.sizeOf is None):
+            return 1
+        return self.sizeOf(value)
+
+    def __Evict(self):
+        while((self.size > self.capacity) and (len(self.entries) > 0)):
+            key, value = self.entries.popitem(last = False)
+            self.size = self.size - self.__EntrySize(value)
+            self.evictions = self.evictions + 1
+
+    def Get(self, key, default = None):
+        with self.lock:
+            if(key in self.entries):
+                self.entries.move_to_end(key)
+                self.hits = self.hits + 1
+                return self.entries[key]
+            self.misses = self.misses + 1
+            return default
+
+    def Put(self, key, value):
+        with self.lock:
+            if(key in self.entries):
+                self.size = self.size - self.__EntrySize(self.entries.pop(key))
+            self.entries[key] = value
+            self.size = self.size + self.__EntrySize(value)
+            self.__Evict()
+
+    def Resize(self, capacity):
+        with self.lock:
+            self.capacity = capacity
+            self.__Evict()
+
+    def Clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def Stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "size": self.size,
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": (float(self.hits) / lookups) if (lookups > 0) else 0.0 }
+
+class OutputCache:
+
+    # Content-addressed store of Gen outputs, one folder per key with the files and an entry.json index
+    # capacity is in bytes, the least recently used entries are removed above it
+    # hardLink: outputs are hard links to the stored files instead of copies, they must not be modified in place,
+    # the writers replace an existing output instead of writing through it
+    def __init__(self, dirPath, capacity = 1024 * 1024 * 1024, hardLink = False):
+        self.dirPath = dirPath
+        self.capacity = capacity
+        self.hardLink = hardLink
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def Key(self, parts):
+        text = json.dumps(parts, sort_keys = True, default = str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __Suffix(self, filePath, path):
+        # The files are saved next to the output and named after it with its extention,
+        # the suffix is what follows the output name, so a hit can be placed under another name
+        name = os.path.splitext(os.path.basename(filePath))[0]
+        fileName = os.path.splitext(os.path.basename(path))[0]
+        if not(fileName.startswith(name)):
+            raise ValueError("file is not named after the output: " + path)
+        return fileName[len(name):]
+
+    def __Path(self, filePath, suffix):
+        path, nameExt = os.path.split(filePath)
+        name, ext = os.path.splitext(nameExt)
+        return os.path.join(path, name + suffix + ext)
+
+    def __TileFiles(self, tiles, filePath, relative):
+        tiles = [dict(tile) for tile in tiles]
+        for tile in tiles:
+            tile["file"] = self.__Suffix(filePath, tile["file"]) if relative else self.__Path(filePath, tile["file"])
+            tile["blockRange"] = tuple(tuple(blockRange) for blockRange in tile["blockRange"])
+        return tiles
+
+    def __Place(self, sourcePath, filePath):
+        # The output is replaced, never written through, it may be a hard link to a stored file
+        import shutil
+
+        tempPath = filePath + "." + str(os.getpid()) + ".tmp"
+        if(os.path.lexists(tempPath)):
+            os.remove(tempPath)
+        try:
+            linked = False
+            if(self.hardLink):
+                try:
+                    os.link(sourcePath, tempPath)
+                    linked = True
+                except OSError:
+                    pass
+            if not(linked):
+                shutil.copyfile(sourcePath, tempPath)
+            os.replace(tempPath, filePath)
+        except OSError:
+            if(os.path.lexists(tempPath)):
+                os.remove(tempPath)
+            raise
+
+    def Load(self, key, filePath):
+        # Place the files of key next to filePath and return the stored result, None on a miss
+        entryPath = os.path.join(self.dirPath, key)
+        try:
+            with open(os.path.join(entryPath, "entry.json")) as file:
+                entry = json.load(file)
+
+            for suffix, storedName in entry["files"]:
+                self.__Place(os.path.join(entryPath, storedName), self.__Path(filePath, suffix))
+
+            # The index modification time is the last use
+            os.utime(os.path.join(entryPath, "entry.json"))
+        except (OSError, ValueError):
+            # Another process may have evicted the entry meanwhile, what is left of it would block the next store
+            import shutil
+            shutil.rmtree(entryPath, ignore_errors = True)
+            self.misses = self.misses + 1
+            return None
+
+        self.hits = self.hits + 1
+        return self.__TileFiles(entry["result"], filePath, False)
+
+    def Store(self, key, filePath, filePaths, result):
+        import shutil
+
+        if not(os.path.isdir(self.dirPath)):
+            os.makedirs(self.dirPath, exist_ok = True)
+
+        ext = os.path.splitext(filePath)[1]
+        entryPath = os.path.join(self.dirPath, key)
+        tempPath = entryPath + "." + str(os.getpid()) + ".tmp"
+        if(os.path.isdir(tempPath)):
+            shutil.rmtree(tempPath)
+        os.makedirs(tempPath)
+
+        files = []
+        size = 0
+        for i, path in enumerate(filePaths):
+            storedName = str(i) + ext
+            shutil.copyfile(path, os.path.join(tempPath, storedName))
+            files.append((self.__Suffix(filePath, path), storedName))
+            size = size + os.path.getsize(path)
+
+        with open(os.path.join(tempPath, "entry.json"), "w") as file:
+            json.dump({
+                "files": files,
+                "result": self.__TileFiles(result, filePath, True),
+                "size": size }, file)
+
+        # Another process may have stored the same key meanwhile, its entry is as good as this one
+        try:
+            os.rename(tempPath, entryPath)
+            self.stores = self.stores + 1
+        except OSError:
+            shutil.rmtree(tempPath, ignore_errors = True)
+
+        self.Evict()
+
+    def Entries(self):
+        # (last use, size, key) of every entry, oldest first
+        entries = []
+        if not(os.path.isdir(self.dirPath)):
+            return entries
+        for key in os.listdir(self.dirPath):
+            indexPath = os.path.join(self.dirPath, key, "entry.json")
+            try:
+                with open(indexPath) as file:
+                    size = json.load(file)["size"]
+                entries.append((os.path.getmtime(indexPath), size, key))
+            except (OSError, ValueError, KeyError):
+                continue
+        return sorted(entries)
+
+    def Evict(self):
+        import shutil
+
+        entries = self.Entries()
+        size = sum(entry[1] for entry in entries)
+        for lastUse, entrySize, key in entries:
+            if(size <= self.capacity):
+                break
+            shutil.rmtree(os.path.join(self.dirPath, key), ignore_errors = True)
+            size = size - entrySize
+            self.evictions = self.evictions + 1
+
+    def Clear(self):
+        import shutil
+
+        for lastUse, entrySize, key in self.Entries():
+            shutil.rmtree(os.path.join(self.dirPath, key), ignore_errors = True)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def Stats(self):
+        entries = self.Entries()
+        return {
+            "entries": len(entries),
+            "size": sum(entry[1] for entry in entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions }
+
+class Profiler:
+
+    # Wall time, calls and bytes written per stage of MarkerPrinter, while started the stage functions are wrapped with timers
+    # A stage counts its own time only, the time of nested stages goes to them, so the stages add up to the profiled time
+    # Work done by worker processes (jobs > 1) is not seen
+    stages = [
+        ("validation", [
+            "CheckChessMarkerImage",
+            "CheckArucoMarkerImage",
+            "_MarkerPrinter__CheckArucoMarkerSheet",
+            "CheckCharucoMarkerImage",
+            "CheckArucoGridMarkerImage"]),
+        ("ArucoBits", ["ArucoBits", "ArucoBitsTensor", "MarkerBitMap"]),
+        ("edges", ["MarkerEdges"]),
+        ("tracing", ["MarkerContours"]),
+        ("glyphs", ["MarkerGlyph"]),
+        ("layout", ["_MarkerPrinter__BoardItems", "_MarkerPrinter__SubBoards", "_MarkerPrinter__BoardFiles"]),
+        ("draw", ["_MarkerPrinter__DrawBoard", "_MarkerPrinter__DrawItems"]),
+        ("squareFill", ["_MarkerPrinter__DrawSquares"]),
+        ("glyphFill", ["DrawGlyph"]),
+        ("rasterize", ["_MarkerPrinter__RenderBitmap", "_MarkerPrinter__RenderStrips"]),
+        ("write", ["SaveBoardPages", "SaveBoardRaster"]),
+        ("preview", ["_MarkerPrinter__PreviewBoard"]),
+        ("load", []),
+        ("flush", []),
+        ("svg2png", []),
+        ("decode", []) ]
+
+    def __init__(self):
+        self.totals = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.saved = {}
+        self.start = None
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, *args):
+        self.Stop()
+
+    def Start(self):
+        if(MarkerPrinter.profiler is not None):
+            raise ValueError("a profiler is already started")
+        for stage, names in Profiler.stages:
+            for name in names:
+                self.saved[name] = MarkerPrinter.__dict__[name]
+                setattr(MarkerPrinter, name, self.Wrap(self.saved[name], stage))
+        MarkerPrinter.profiler = self
+        self.start = time.perf_counter()
+
+    def Stop(self):
+        if(MarkerPrinter.profiler is not self):
+            return
+        self.seconds = self.seconds + time.perf_counter() - self.start
+        for name, function in self.saved.items():
+            setattr(MarkerPrinter, name, function)
+        self.saved.clear()
+        MarkerPrinter.profiler = None
+
+    def Enter(self, stage):
+        stack = getattr(self.local, "stack", None)
+        if(stack is None):
+            stack = self.local.stack = []
+        stack.append([stage, time.perf_counter(), 0.0])
+
+    def Exit(self):
+        stack = self.local.stack
+        stage, start, childSeconds = stack.pop()
+        elapsed = time.perf_counter() - start
+        if(len(stack) > 0):
+            stack[-1][2] = stack[-1][2] + elapsed
+        self.Add(stage, elapsed - childSeconds, calls = 1)
+
+    def Add(self, stage, seconds = 0.0, calls = 0, bytesWritten = 0):
+        with self.lock:
+            total = self.totals.get(stage, None)
+            if(total is None):
+                total = self.totals[stage] = [0.0, 0, 0]
+            total[0] = total[0] + seconds
+            total[1] = total[1] + calls
+            total[2] = total[2] + bytesWritten
+
+    @contextlib.contextmanager
+    def Stage(self, stage):
+        self.Enter(stage)
+        try:
+            yield
+        finally:
+            self.Exit()
+
+    def Wrap(self, function, stage):
+        # inspect is only needed with --profile, it is slow to import
+        import inspect
+        if(inspect.isgeneratorfunction(function)):
+            # Generators run step by step inside their consumer, every step is timed
+            def ProfiledGenerator(*args, **kwargs):
+                generator = function(*args, **kwargs)
+                while(True):
+                    self.Enter(stage)
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        self.Exit()
+                    yield item
+            ProfiledGenerator.__wrapped__ = function
+            return ProfiledGenerator
+
+        def Profiled(*args, **kwargs):
+            self.Enter(stage)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.Exit()
+        # A local function can not be sent to worker processes, RunParallel sends the name of the wrapped one
+        Profiled.__wrapped__ = function
+        return Profiled
+
+    def Stats(self):
+        seconds = self.seconds
+        if(MarkerPrinter.profiler is self):
+            seconds = seconds + time.perf_counter() - self.start
+
+        with self.lock:
+            order = [stage for stage, names in Profiler.stages]
+            stages = sorted(self.totals.keys(), key = lambda stage: order.index(stage) if (stage in order) else len(order))
+            stats = [{
+                "stage": stage,
+                "seconds": self.totals[stage][0],
+                "calls": self.totals[stage][1],
+                "bytes": self.totals[stage][2] } for stage in stages]
+            profiled = sum(stat["seconds"] for stat in stats)
+
+        # Time outside every stage: argument handling, loops of the Gen functions, ...
+        stats.append({
+            "stage": "other",
+            "seconds": max(0.0, seconds - profiled),
+            "calls": 0,
+            "bytes": 0 })
+        return {
+            "seconds": seconds,
+            "stages": stats }
+
+    def Clear(self):
+        with self.lock:
+            self.totals.clear()
+            self.seconds = 0.0
+            if(MarkerPrinter.profiler is self):
+                self.start = time.perf_counter()
+
+class RenderCancelled(Exception):
+
+    # Raised by MarkerPrinter.CheckCancel when the cancel check of the rendering thread returns True
+    pass
+
+def ProfileStage(stage):
+    # Times a block as stage while a Profiler is started, does nothing otherwise
+    if(MarkerPrinter.profiler is None):
+        return contextlib.nullcontext()
+    return MarkerPrinter.profiler.Stage(stage)
+
+class VectorWriter:
+
+    # The part of the cairo surface and context API MarkerPrinter draws with, for writers that emit the file themselves
+    # Only translate and scale transforms are supported, paths are kept in page points
+    # Fill rules have the values of cairo, so that the native writers never import it
+    FILL_RULE_WINDING = 0
+    FILL_RULE_EVEN_ODD = 1
+
+    def __init__(self, filePath, width, height):
+        self.filePath = filePath
+        self.width = width
+        self.height = height
+        self.matrix = (1.0, 1.0, 0.0, 0.0)
+        self.rgb = (0.0, 0.0, 0.0)
+        self.evenOdd = False
+        self.lineWidth = 2.0
+        self.stack = []
+        self.path = []
+        self.glyphs = {}
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.finish()
+
+    def finish(self):
+        if(self.file is not None):
+            self.WriteEnd()
+            self.file.close()
+            self.file = None
+
+    def save(self):
+        self.stack.append((self.matrix, self.rgb, self.evenOdd, self.lineWidth))
+
+    def restore(self):
+        self.matrix, self.rgb, self.evenOdd, self.lineWidth = self.stack.pop()
+
+    def translate(self, x, y):
+        sx, sy, tx, ty = self.matrix
+        self.matrix = (sx, sy, tx + sx * x, ty + sy * y)
+
+    def scale(self, x, y):
+        sx, sy, tx, ty = self.matrix
+        self.matrix = (sx * x, sy * y, tx, ty)
+
+    def set_source_rgba(self, r, g, b, a = 1.0):
+        self.rgb = (r, g, b)
+
+    def set_fill_rule(self, fillRule):
+        self.evenOdd = (fillRule == VectorWriter.FILL_RULE_EVEN_ODD)
+
+    def set_line_width(self, lineWidth):
+        self.lineWidth = lineWidth
+
+    def move_to(self, x, y):
+        sx, sy, tx, ty = self.matrix
+        self.path.append([(tx + sx * x, ty + sy * y)])
+
+    def line_to(self, x, y):
+        sx, sy, tx, ty = self.matrix
+        self.path[-1].append((tx + sx * x, ty + sy * y))
+
+    def close_path(self):
+        pass
+
+    def rectangle(self, x, y, width, height):
+        self.move_to(x, y)
+        self.line_to(x + width, y)
+        self.line_to(x + width, y + height)
+        self.line_to(x, y + height)
+
+    def fill(self):
+        self.WriteFill(self.path, self.rgb, self.evenOdd)
+        self.path = []
+
+    def stroke(self):
+        self.WriteStroke(self.path, self.rgb, self.lineWidth * self.matrix[0])
+        self.path = []
+
+    def use_glyph(self, glyph, originX, originY, unitLength):
+        # Glyphs are closed polygons in cell units filled black, written once and placed by reference
+        sx, sy, tx, ty = self.matrix
+        self.rgb = (0.0, 0.0, 0.0)
+        if not(id(glyph) in self.glyphs):
+            name = "g" + str(len(self.glyphs))
+            self.glyphs[id(glyph)] = (name, glyph)
+            self.WriteGlyph(name, glyph)
+        self.WriteUse(self.glyphs[id(glyph)][0], tx + sx * originX, ty + sy * originY, sx * unitLength, self.rgb)
+
+    def set_size(self, width, height):
+        raise ValueError("page size can not be changed")
+
+    def show_page(self):
+        raise ValueError("file has only one page")
+
+class SVGWriter(VectorWriter):
+
+    # Streaming SVG, coordinates are integers in 1/unitsPerPoint points, glyphs are <defs> placed with <use>
+    unitsPerPoint = 100
+
+    def __init__(self, filePath, width, height):
+        VectorWriter.__init__(self, filePath, width, height)
+        self.file = open(filePath, "w", encoding = "utf-8")
+        self.file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1" '
+            'width="%spt" height="%spt" viewBox="0 0 %d %d">\n' % (
+                SVGWriter.Number(width), SVGWriter.Number(height), self.Unit(width), self.Unit(height)))
+
+    def Number(value):
+        return ("%.6g" % value)
+
+    def Unit(self, value):
+        return int(round(value * self.unitsPerPoint))
+
+    def Color(rgb):
+        return "rgb(%s%%,%s%%,%s%%)" % tuple(SVGWriter.Number(c * 100) for c in rgb)
+
+    def PathData(subpaths):
+        # Rectilinear polygons mostly, relative h and v keep them short
+        data = []
+        for points in subpaths:
+            if(len(points) < 2):
+                continue
+            x, y = points[0]
+            data.append("M%d %d" % (x, y))
+
+            # Contours step one cell at a time, straight runs are joined
+            steps = []
+            for nx, ny in points[1:]:
+                dx, dy = nx - x, ny - y
+                if((len(steps) > 0) and (dx * steps[-1][1] == dy * steps[-1][0]) and (dx * steps[-1][0] + dy * steps[-1][1] > 0)):
+                    steps[-1] = (steps[-1][0] + dx, steps[-1][1] + dy)
+                else:
+                    steps.append((dx, dy))
+                x, y = nx, ny
+
+            for dx, dy in steps:
+                if(dy == 0):
+                    data.append("h%d" % dx)
+                elif(dx == 0):
+                    data.append("v%d" % dy)
+                else:
+                    data.append("l%d %d" % (dx, dy))
+            data.append("z")
+        return "".join(data)
+
+    def WriteFill(self, path, rgb, evenOdd):
+        subpaths = [[(self.Unit(x), self.Unit(y)) for x, y in points] for points in path]
+        self.file.write('<path d="%s" fill="%s"%s/>\n' % (
+            SVGWriter.PathData(subpaths), SVGWriter.Color(rgb), ' fill-rule="evenodd"' if evenOdd else ""))
+
+    def WriteStroke(self, path, rgb, lineWidth):
+        data = []
+        for points in path:
+            data.append("M" + "L".join("%d %d" % (self.Unit(x), self.Unit(y)) for x, y in points))
+        self.file.write('<path d="%s" fill="none" stroke="%s" stroke-width="%s"/>\n' % (
+            "".join(data), SVGWriter.Color(rgb), SVGWriter.Number(lineWidth * self.unitsPerPoint)))
+
+    def WriteGlyph(self, name, glyph):
+        self.file.write('<defs><path id="%s" d="%s" fill-rule="evenodd"/></defs>\n' % (
+            name, SVGWriter.PathData([[(int(x), int(y)) for x, y in vertices] for vertices in glyph])))
+
+    def WriteUse(self, name, x, y, scale, rgb):
+        self.file.write('<use xlink:href="#%s" transform="translate(%d %d) scale(%s)" fill="%s"/>\n' % (
+            name, self.Unit(x), self.Unit(y), SVGWriter.Number(scale * self.unitsPerPoint), SVGWriter.Color(rgb)))
+
+    def WriteEnd(self):
+        self.file.write("</svg>\n")
+
+class ContentWriter(VectorWriter):
+
+    # PDF and PS pages share one set of path operators, PSWriter defines them in its prolog
+    # Content is written in page points with the y axis down, flipped once at the top of every page
+    def __init__(self, filePath, width, height):
+        VectorWriter.__init__(self, filePath, width, height)
+        self.pageOpen = False
+        self.pageSizes = []
+        self.file = open(filePath, "wb")
+
+    def Number(value):
+        text = "%.3f" % value
+        text = text.rstrip("0").rstrip(".")
+        return "0" if (text in ("", "-0")) else text
+
+    def ColorOperator(rgb, stroke = False):
+        if(rgb[0] == rgb[1] == rgb[2]):
+            return ContentWriter.Number(rgb[0]) + (" G" if stroke else " g")
+        return " ".join(ContentWriter.Number(c) for c in rgb) + (" RG" if stroke else " rg")
+
+    def Simplify(points):
+        # Drop the vertices inside straight runs
+        points = [tuple(point) for point in points]
+        simple = [points[0]]
+        for i in range(1, len(points)):
+            if(i + 1 < len(points)):
+                (x0, y0), (x1, y1), (x2, y2) = simple[-1], points[i], points[i + 1]
+                if(((x1 - x0) * (y2 - y1) == (y1 - y0) * (x2 - x1)) and ((x1 - x0) * (x2 - x1) + (y1 - y0) * (y2 - y1) > 0)):
+                    continue
+            simple.append(points[i])
+        return simple
+
+    def PathOperators(subpaths, Number):
+        operators = []
+        for points in subpaths:
+            if(len(points) < 2):
+                continue
+            if((len(points) == 4) and (points[0][1] == points[1][1]) and (points[1][0] == points[2][0]) and (points[2][1] == points[3][1]) and (points[3][0] == points[0][0])):
+                operators.append("%s %s %s %s re" % (Number(points[0][0]), Number(points[0][1]), Number(points[2][0] - points[0][0]), Number(points[2][1] - points[0][1])))
+                continue
+            points = ContentWriter.Simplify(points)
+            operators.append("%s %s m" % (Number(points[0][0]), Number(points[0][1])))
+            for x, y in points[1:]:
+                operators.append("%s %s l" % (Number(x), Number(y)))
+            operators.append("h")
+        return "\n".join(operators)
+
+    def GlyphOperators(glyph):
+        return ContentWriter.PathOperators([[(int(x), int(y)) for x, y in vertices] for vertices in glyph], str) + "\nf*"
+
+    def Content(self, text):
+        if not(self.pageOpen):
+            self.BeginPage()
+            self.pageOpen = True
+        self.WriteContent(text + "\n")
+
+    def WriteFill(self, path, rgb, evenOdd):
+        self.Content(ContentWriter.ColorOperator(rgb) + "\n" + ContentWriter.PathOperators(path, ContentWriter.Number) + ("\nf*" if evenOdd else "\nf"))
+
+    def WriteStroke(self, path, rgb, lineWidth):
+        self.Content(ContentWriter.ColorOperator(rgb, True) + "\n" + ContentWriter.Number(lineWidth) + " w\n" +
+            "\n".join(" ".join(["%s %s %s" % (ContentWriter.Number(x), ContentWriter.Number(y), "l" if (i > 0) else "m") for i, (x, y) in enumerate(points)]) for points in path) + "\nS")
+
+    def WriteGlyph(self, name, glyph):
+        pass
+
+    def WriteUse(self, name, x, y, scale, rgb):
+        self.DefineGlyph(name)
+        self.Content("%s\nq %s 0 0 %s %s %s cm %s Q" % (ContentWriter.ColorOperator(rgb), ContentWriter.Number(scale), ContentWriter.Number(scale),
+            ContentWriter.Number(x), ContentWriter.Number(y), self.GlyphCall(name)))
+
+    def DefineGlyph(self, name):
+        pass
+
+    def set_size(self, width, height):
+        if(self.pageOpen):
+            raise ValueError("page size can not be changed after drawing")
+        self.width = width
+        self.height = height
+
+    def show_page(self):
+        if not(self.pageOpen):
+            self.BeginPage()
+        self.EndPage()
+        self.pageOpen = False
+
+    def WriteEnd(self):
+        if(self.pageOpen or (len(self.pageSizes) == 0)):
+            self.show_page()
+        self.WriteTrailer()
+
+class PDFWriter(ContentWriter):
+
+    # Streaming PDF, page contents are deflated as they are drawn, every glyph is a form XObject shared by all pages
+    # Objects 1, 2 and 3 are the catalog, the page tree and the shared resources, written last
+    def __init__(self, filePath, width, height):
+        ContentWriter.__init__(self, filePath, width, height)
+        self.offsets = {}
+        self.nextObject = 4
+        self.pages = []
+        self.pendingGlyphs = []
+        self.glyphObjects = {}
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def NewObject(self):
+        self.nextObject = self.nextObject + 1
+        return self.nextObject - 1
+
+    def BeginObject(self, number):
+        self.offsets[number] = self.file.tell()
+        self.file.write(("%d 0 obj\n" % number).encode("ascii"))
+
+    def WriteObject(self, number, text):
+        self.BeginObject(number)
+        self.file.write((text + "\nendobj\n").encode("ascii"))
+
+    def BeginPage(self):
+        self.contentObject = self.NewObject()
+        self.lengthObject = self.NewObject()
+        self.BeginObject(self.contentObject)
+        self.file.write(("<< /Length %d 0 R /Filter /FlateDecode >>\nstream\n" % self.lengthObject).encode("ascii"))
+        self.streamStart = self.file.tell()
+        self.compressor = zlib.compressobj(6)
+        self.WriteContent("1 0 0 -1 0 %s cm\n" % ContentWriter.Number(self.height))
+
+    def WriteContent(self, text):
+        self.file.write(self.compressor.compress(text.encode("ascii")))
+
+    def EndPage(self):
+        self.file.write(self.compressor.flush())
+        length = self.file.tell() - self.streamStart
+        self.file.write(b"\nendstream\nendobj\n")
+        self.WriteObject(self.lengthObject, str(length))
+        self.pages.append((self.NewObject(), self.contentObject, self.width, self.height))
+        self.pageSizes.append((self.width, self.height))
+
+        # Glyphs first used on this page, they can not be written inside its content stream
+        for glyphObject, glyph in self.pendingGlyphs:
+            data = zlib.compress(ContentWriter.GlyphOperators(glyph).encode("ascii"), 6)
+            cells = max(max(int(x) for x, y in vertices) for vertices in glyph)
+            self.BeginObject(glyphObject)
+            self.file.write(("<< /Type /XObject /Subtype /Form /BBox [0 0 %d %d] /Filter /FlateDecode /Length %d >>\nstream\n" % (cells, cells, len(data))).encode("ascii"))
+            self.file.write(data)
+            self.file.write(b"\nendstream\nendobj\n")
+        self.pendingGlyphs = []
+
+    def WriteGlyph(self, name, glyph):
+        self.glyphObjects[name] = self.NewObject()
+        self.pendingGlyphs.append((self.glyphObjects[name], glyph))
+
+    def GlyphCall(self, name):
+        return "/" + name + " Do"
+
+    def WriteTrailer(self):
+        for pageObject, contentObject, width, height in self.pages:
+            self.WriteObject(pageObject, "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] /Resources 3 0 R /Contents %d 0 R >>" % (
+                ContentWriter.Number(width), ContentWriter.Number(height), contentObject))
+
+        self.WriteObject(2, "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join("%d 0 R" % page[0] for page in self.pages), len(self.pages)))
+        self.WriteObject(3, "<< /XObject << %s >> >>" % " ".join("/%s %d 0 R" % item for item in sorted(self.glyphObjects.items())))
+        self.WriteObject(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref = self.file.tell()
+        self.file.write(("xref\n0 %d\n0000000000 65535 f \n" % self.nextObject).encode("ascii"))
+        for number in range(1, self.nextObject):
+            self.file.write(("%010d 00000 n \n" % self.offsets[number]).encode("ascii"))
+        self.file.write(("trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.nextObject, xref)).encode("ascii"))
+
+class PSWriter(ContentWriter):
+
+    # DSC PostScript, every glyph is a procedure defined on each page that uses it, so pages stay independent
+    prolog = \
+        "/m { moveto } bind def /l { lineto } bind def /h { closepath } bind def\n" \
+        "/re { 4 2 roll moveto 1 index 0 rlineto 0 exch rlineto neg 0 rlineto closepath } bind def\n" \
+        "/f { fill } bind def /f* { eofill } bind def /S { stroke } bind def /w { setlinewidth } bind def\n" \
+        "/g { setgray } bind def /G { setgray } bind def /rg { setrgbcolor } bind def /RG { setrgbcolor } bind def\n" \
+        "/q { gsave } bind def /Q { grestore } bind def /cm { 6 array astore concat } bind def\n"
+
+    def __init__(self, filePath, width, height):
+        ContentWriter.__init__(self, filePath, width, height)
+        self.pageGlyphs = set()
+        self.glyphProcedures = {}
+        self.file.write((
+            "%%!PS-Adobe-3.0\n%%%%BoundingBox: 0 0 %d %d\n%%%%HiResBoundingBox: 0 0 %s %s\n%%%%Pages: (atend)\n%%%%EndComments\n"
+            "%%%%BeginProlog\n%s%%%%EndProlog\n" % (
+                math.ceil(width), math.ceil(height), ContentWriter.Number(width), ContentWriter.Number(height), PSWriter.prolog)).encode("ascii"))
+
+    def BeginPage(self):
+        page = len(self.pageSizes) + 1
+        self.pageGlyphs = set()
+        self.WriteContent("%%%%Page: %d %d\n%%%%PageBoundingBox: 0 0 %d %d\n<< /PageSize [%s %s] >> setpagedevice\n1 0 0 -1 0 %s cm\n" % (
+            page, page, math.ceil(self.width), math.ceil(self.height),
+            ContentWriter.Number(self.width), ContentWriter.Number(self.height), ContentWriter.Number(self.height)))
+
+    def WriteContent(self, text):
+        self.file.write(text.encode("ascii"))
+
+    def EndPage(self):
+        self.WriteContent("showpage\n")
+        self.pageSizes.append((self.width, self.height))
+
+    def WriteGlyph(self, name, glyph):
+        self.glyphProcedures[name] = "{\n" + ContentWriter.GlyphOperators(glyph) + "\n} bind def"
+
+    def DefineGlyph(self, name):
+        if not(name in self.pageGlyphs):
+            self.Content("/" + name + " " + self.glyphProcedures[name])
+            self.pageGlyphs.add(name)
+
+    def GlyphCall(self, name):
+        return name
+
+    def WriteTrailer(self):
+        self.WriteContent("%%%%Trailer\n%%%%Pages: %d\n%%%%EOF\n" % len(self.pageSizes))
+
 class MarkerPrinter:
 
     debugMode = None # "LINE" "BLOCK"
 
+    # The started Profiler, if any
+    profiler = None
+
+    # Cancel check of every rendering thread, see SetCancelCheck
+    cancelCheck = threading.local()
+
+    # OutputCache of the Gen functions, None to always render
+    outputCache = None
+    libraryVersion = None
+
+    # ISO 8601 date cairo writes into pdf and ps files, such as "2019-01-01T00:00:00Z", None uses SOURCE_DATE_EPOCH or the current time
+    creationDate = None
+
+    previewBackend = "CAIRO" # "CAIRO" "NUMPY" "SVG"
+    rasterStripRows = 256
+
     # Static Vars
     # SVG https://oreillymedia.github.io/Using_SVG/guide/units.html
     # for PDF and SVG, 1 pixel = 1/72 inch, 1 cm = 1/2.54 inch, 1pixl = 2.54/72 cm, 1cm = 72/2.54 pixels
     ptPerMeter = 72 / 2.54 * 100
 
+    # cairo surface class names, cairo is only imported when one is created
     surface = {
-            ".SVG": cairo.SVGSurface,
-            ".PDF": cairo.PDFSurface,
-            ".PS": cairo.PSSurface }
+            ".SVG": "SVGSurface",
+            ".PDF": "PDFSurface",
+            ".PS": "PSSurface" }
 
-    if (os.path.isfile("arucoDictBytesList.npz")):
-        arucoDictBytesList = np.load("arucoDictBytesList.npz")
-    else:
-        warnings.warn("Missing build-in arucoDictBytesList.npz, generate it again")
-        arucoDictBytesList = SaveArucoDictBytesList(filePath = "arucoDictBytesList.npz")
+    # Files are written by the cairo surfaces or by the VectorWriter of the extention
+    vectorBackend = {
+            ".SVG": "CAIRO",
+            ".PDF": "CAIRO",
+            ".PS": "CAIRO" } # "CAIRO" "NATIVE"
+
+    nativeSurface = {
+            ".SVG": SVGWriter,
+            ".PDF": PDFWriter,
+            ".PS": PSWriter }
+
+    arucoDictBytesList = ArucoDictBytesList()
 
     arucoDictMarkerSize = \
         {
@@ -84,45 +1062,235 @@ class MarkerPrinter:
             "DICT_APRILTAG_36h11": 6,
         }
 
-    def ArucoBits(dictionary, markerID):
-        bytesList = MarkerPrinter.arucoDictBytesList[dictionary][markerID].ravel()
+    arucoDictBitsList = ArucoDictBitsList()
+
+    # Traced marker outlines keyed by (dictionary, markerID, borderBits)
+    glyphCache = LRUCache(capacity = 4096)
+
+    def ArucoBitsTensor(dictionary, markerIDs = None):
+        bytesList = MarkerPrinter.arucoDictBytesList[dictionary]
         markerSize = MarkerPrinter.arucoDictMarkerSize[dictionary]
 
-        arucoBits = np.zeros(shape = (markerSize, markerSize), dtype = bool)
-        base2List = np.array( [128, 64, 32, 16, 8, 4, 2, 1], dtype = np.uint8)
-        currentByteIdx = 0
-        currentByte = bytesList[currentByteIdx]
-        currentBit = 0
-        for row in range(markerSize):
-            for col in range(markerSize):
-                if(currentByte >= base2List[currentBit]):
-                    arucoBits[row, col] = True
-                    currentByte -= base2List[currentBit]
-                currentBit = currentBit + 1
-                if(currentBit == 8):
-                    currentByteIdx = currentByteIdx + 1
-                    currentByte = bytesList[currentByteIdx]
-                    if(8 * (currentByteIdx + 1) > arucoBits.size):
-                        currentBit = 8 * (currentByteIdx + 1) - arucoBits.size
+        if(markerIDs is not None):
+            bytesList = bytesList[np.asarray(markerIDs, dtype = np.intp).ravel()]
+
+        # Only the first rotation is used, it is stored in the first bytes of each marker
+        bitSize = markerSize * markerSize
+        byteSize = (bitSize + 7) // 8
+        bytesList = bytesList.reshape(bytesList.shape[0], -1)[:, :byteSize]
+
+        # The bits of the trailing byte are aligned to its least significant bit
+        bits = np.unpackbits(bytesList, axis = 1)
+        tailBits = bitSize - 8 * (byteSize - 1)
+        bits = np.concatenate((bits[:, :8 * (byteSize - 1)], bits[:, 8 * byteSize - tailBits:]), axis = 1)
+        return bits.reshape(-1, markerSize, markerSize).astype(bool)
+
+    def ArucoBits(dictionary, markerID):
+        return np.array(MarkerPrinter.arucoDictBitsList[dictionary][markerID], dtype = bool)
+
+    def MarkerEdges(markerBitMap, borderBits = 1):
+        markerSize = markerBitMap.shape[0] - borderBits * 2
+
+        # Cells of the marker plus the ring of border cells around it
+        cells = markerBitMap[borderBits - 1:borderBits + markerSize + 1, borderBits - 1:borderBits + markerSize + 1]
+
+        # hEdges[mx, my] is the edge above cell (mx, my), vEdges[mx, my] is the edge left of cell (mx, my)
+        hEdges = np.zeros(shape = (markerSize+1,markerSize+1), dtype = bool)
+        vEdges = np.zeros(shape = (markerSize+1,markerSize+1), dtype = bool)
+        hEdges[:markerSize, :] = cells[1:-1, :-1] ^ cells[1:-1, 1:]
+        vEdges[:, :markerSize] = cells[:-1, 1:-1] ^ cells[1:, 1:-1]
+        return hEdges, vEdges
+
+    def MarkerContours(markerBitMap, borderBits = 1):
+        markerSize = markerBitMap.shape[0] - borderBits * 2
+        hEdges, vEdges = MarkerPrinter.MarkerEdges(markerBitMap, borderBits)
+        hEdges = hEdges.tolist()
+        vEdges = vEdges.tolist()
+
+        # Closed boundaries as (vertices, black), vertices are in cells of markerBitMap.
+        # Tracing only removes edges, so the scan for start positions never restarts and every edge is visited once.
+        contours = []
+        for sy in range(markerSize):
+            for sx in range(markerSize):
+                if not(hEdges[sx][sy]):
+                    continue
+
+                # The cell above the start edge is outside of the loop
+                black = bool(markerBitMap[sx + borderBits, sy + borderBits - 1])
+
+                # Use wall follower maze solving algorithm to walk the loop
+                vertices = [(sx + borderBits, sy + borderBits)]
+                cx = sx
+                cy = sy
+                cd = 3 # 0 right, 1 down, 2 left, 3 up
+                while(True):
+                    nd = (cd + 1)%4
+                    moved = False
+                    if(nd == 0):
+                        if(hEdges[cx][cy]):
+                            hEdges[cx][cy] = False
+                            cx = cx + 1
+                            moved = True
+                    elif(nd == 1):
+                        if(vEdges[cx][cy]):
+                            vEdges[cx][cy] = False
+                            cy = cy + 1
+                            moved = True
+                    elif(nd == 2):
+                        if(hEdges[cx - 1][cy]):
+                            hEdges[cx - 1][cy] = False
+                            cx = cx - 1
+                            moved = True
+                    elif(nd == 3):
+                        if(vEdges[cx][cy - 1]):
+                            vEdges[cx][cy - 1] = False
+                            cy = cy - 1
+                            moved = True
+
+                    if((cx == sx) and (cy == sy)):
+                        break
                     else:
-                        currentBit = 0;
-        return arucoBits
+                        if(moved):
+                            vertices.append((cx + borderBits, cy + borderBits))
+                        cd = nd
+
+                contours.append((np.array(vertices, dtype = np.int32), black))
+
+        return contours
+
+    def MarkerBitMap(dictionary, markerID, borderBits = 1):
+        marker = MarkerPrinter.ArucoBits(dictionary, markerID)
+        markerSize = marker.shape[0]
+
+        markerBitMap = np.zeros(shape = (markerSize+borderBits*2, markerSize+borderBits*2), dtype = bool)
+        markerBitMap[borderBits:-borderBits,borderBits:-borderBits] = marker
+        return np.swapaxes(markerBitMap, 0, 1)
+
+    def MarkerGlyph(dictionary, markerID, borderBits = 1):
+        # Closed polygons in cell units, the marker including its border spans markerSize + borderBits * 2 cells
+        # The outline of the marker and every black/white boundary, filled black with the even-odd rule
+        key = (dictionary, int(markerID), int(borderBits))
+        glyph = MarkerPrinter.glyphCache.Get(key)
+        if(glyph is None):
+            markerBitMap = MarkerPrinter.MarkerBitMap(dictionary, markerID, borderBits)
+            cells = markerBitMap.shape[0]
+            glyph = [np.array([(0, 0), (cells, 0), (cells, cells), (0, cells)], dtype = np.int32)]
+            glyph.extend(vertices for vertices, black in MarkerPrinter.MarkerContours(markerBitMap, borderBits))
+            MarkerPrinter.glyphCache.Put(key, glyph)
+        return glyph
+
+    def __SetFillRule(context, evenOdd):
+        # Native writers take their own fill rule constants, cairo is only imported for cairo contexts
+        fillRules = VectorWriter if isinstance(context, VectorWriter) else cairo
+        context.set_fill_rule(fillRules.FILL_RULE_EVEN_ODD if evenOdd else fillRules.FILL_RULE_WINDING)
+
+    def DrawGlyph(context, glyph, originX, originY, unitLength):
+        if(isinstance(context, VectorWriter)):
+            context.use_glyph(glyph, originX, originY, unitLength)
+            return
+
+        context.save()
+        context.translate(originX, originY)
+        context.scale(unitLength, unitLength)
+        context.set_source_rgba(0.0, 0.0, 0.0, 1.0)
+        for vertices in glyph:
+            context.move_to(vertices[0][0], vertices[0][1])
+            for vx, vy in vertices[1:]:
+                context.line_to(vx, vy)
+            context.close_path()
+        MarkerPrinter.__SetFillRule(context, True)
+        context.fill()
+        context.restore()
+
+    def __MarkerItems(dictionary, markerID, markerLength, borderBits, originX, originY):
+        markerSize = MarkerPrinter.arucoDictMarkerSize[dictionary]
+        unitLength = markerLength / (float)(markerSize + borderBits * 2)
 
-    def __DrawBlock(context,
-        dictionary = None, markerLength = None, borderBits = 1,
-        chessboardSize = (1, 1), squareLength = None, firstMarkerID = 0,
-        blockX = 0, blockY = 0, originX = 0, originY = 0, pageBorderX = 0, pageBorderY = 0,
-        mode = "CHESS" ):
+        # Use for debug, check edge or position is correct or not
+        if(MarkerPrinter.debugMode is not None):
+            items = [("RECT", 0.0, originX, originY, markerLength, markerLength)]
+            markerBitMap = MarkerPrinter.MarkerBitMap(dictionary, markerID, borderBits)
 
-        if(squareLength is None):
-            squareLength = markerLength
+            if(MarkerPrinter.debugMode.upper() == "LINE"):
+                hEdges, vEdges = MarkerPrinter.MarkerEdges(markerBitMap, borderBits)
+                for mx in range(markerSize+1):
+                    for my in range(markerSize+1):
+                        if(hEdges[mx, my]):
+                            items.append(("LINE", 1.0,
+                                originX + unitLength * (mx + borderBits    ), originY + unitLength * (my + borderBits    ),
+                                originX + unitLength * (mx + borderBits + 1), originY + unitLength * (my + borderBits    ),
+                                unitLength * 0.1))
+                        if(vEdges[mx, my]):
+                            items.append(("LINE", 1.0,
+                                originX + unitLength * (mx + borderBits    ), originY + unitLength * (my + borderBits    ),
+                                originX + unitLength * (mx + borderBits    ), originY + unitLength * (my + borderBits + 1),
+                                unitLength * 0.1))
+
+            elif(MarkerPrinter.debugMode.upper() == "BLOCK"):
+                for mx in range(markerSize):
+                    for my in range(markerSize):
+                        if(markerBitMap[mx + borderBits, my + borderBits]):
+                            items.append(("RECT", 1.0,
+                                originX + unitLength * (mx + borderBits),
+                                originY + unitLength * (my + borderBits),
+                                unitLength, unitLength))
+
+        else:
+            items = [("GLYPH", MarkerPrinter.MarkerGlyph(dictionary, markerID, borderBits), originX, originY, unitLength)]
+
+        return items
+
+    def LibraryVersion():
+        # Hash of this module and of the aruco data, the bit store included, cached outputs of another version are never used
+        if(MarkerPrinter.libraryVersion is None):
+            digest = hashlib.sha256()
+            filePaths = [os.path.abspath(__file__), MarkerPrinter.arucoDictBytesList.filePath]
+            for dictionary in sorted(MarkerPrinter.arucoDictMarkerSize):
+                filePaths.append(os.path.join(MarkerPrinter.arucoDictBitsList.dirPath, dictionary + ".npy"))
+            for filePath in filePaths:
+                # A missing file is hashed too, a store generated later changes the version
+                digest.update(os.path.basename(filePath).encode("utf-8"))
+                if(os.path.isfile(filePath)):
+                    with open(filePath, "rb") as file:
+                        data = file.read()
+                    digest.update(struct.pack(">Q", len(data)))
+                    digest.update(data)
+                else:
+                    digest.update(b"\0")
+            MarkerPrinter.libraryVersion = digest.hexdigest()
+        return MarkerPrinter.libraryVersion
+
+    def CreationDate():
+        if(MarkerPrinter.creationDate is not None):
+            return MarkerPrinter.creationDate
+        epoch = os.environ.get("SOURCE_DATE_EPOCH", None)
+        if(epoch is not None):
+            return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(int(epoch)))
+        return None
+
+    def SetCancelCheck(check):
+        # check: callable, the renders of the calling thread raise RenderCancelled once it returns True, None to remove it
+        MarkerPrinter.cancelCheck.check = check
+
+    def CheckCancel():
+        check = getattr(MarkerPrinter.cancelCheck, "check", None)
+        if((check is not None) and check()):
+            raise RenderCancelled("render cancelled")
+
+    def __BlockItems(board, blockX, blockY):
+        # Drawing items of one block, in points from the top left corner of the board
+        MarkerPrinter.CheckCancel()
+        mode = board["mode"]
+        dictionary = board["dictionary"]
+        chessboardSize = board["chessboardSize"]
+        squareLength = board["squareLength"]
+        markerLength = board["markerLength"]
+        borderBits = board["borderBits"]
+        firstMarkerID = board["firstMarkerID"]
 
         if(markerLength is None):
             markerLength = squareLength
 
-        if((squareLength is None) or (markerLength is None)):
-            raise ValueError("lenght is None")
-
         dawMarkerBlock = False
         if ((mode == "ARUCO") or (mode == "ARUCOGRID")):
             dawMarkerBlock = True
@@ -131,21 +1299,18 @@ class MarkerPrinter:
         else:
             dawMarkerBlock = (( blockX % 2 == 0 ) != ( blockY % 2 == 0 ))
 
+        items = []
         if(dawMarkerBlock):
             if (mode != "CHESS"):
                 if(dictionary is None):
                     raise ValueError("dictionary is None")
 
                 if (mode == "CHARUCO"):
-                    originX = (blockX - originX) * squareLength + (squareLength - markerLength)*0.5 + pageBorderX
-                    originY = (blockY - originY) * squareLength + (squareLength - markerLength)*0.5 + pageBorderY
+                    originX = blockX * squareLength + (squareLength - markerLength)*0.5
+                    originY = blockY * squareLength + (squareLength - markerLength)*0.5
                 else:
-                    originX = (blockX - originX) * squareLength + pageBorderX
-                    originY = (blockY - originY) * squareLength + pageBorderY
-
-                context.set_source_rgba(0.0, 0.0, 0.0, 1.0)
-                context.rectangle(originX, originY, markerLength, markerLength)
-                context.fill()
+                    originX = blockX * squareLength
+                    originY = blockY * squareLength
 
                 # Generate marker
                 if  (mode == "CHARUCO"):
@@ -155,127 +1320,621 @@ class MarkerPrinter:
                 elif (mode == "ARUCOGRID"):
                     markerID = firstMarkerID + (blockY * chessboardSize[0] + blockX)
 
-                marker = MarkerPrinter.ArucoBits(dictionary, markerID)
-                markerSize = marker.shape[0]
-                unitLength = markerLength / (float)(markerSize + borderBits * 2)
+                items.extend(MarkerPrinter.__MarkerItems(dictionary, markerID, markerLength, borderBits, originX, originY))
 
-                markerBitMap = np.zeros(shape = (markerSize+borderBits*2, markerSize+borderBits*2), dtype = bool)
-                markerBitMap[borderBits:-borderBits,borderBits:-borderBits] = marker
-                markerBitMap = np.swapaxes(markerBitMap, 0, 1)
+        # The black squares are drawn for the whole block range by __DrawSquares
+        return items
 
-                # Compute edges
-                hEdges = np.zeros(shape = (markerSize+1,markerSize+1), dtype = bool)
-                vEdges = np.zeros(shape = (markerSize+1,markerSize+1), dtype = bool)
+    def __BoardItems(board):
+        # Built once per board and shared by the full board and its tiles
+        (blockX0, blockX1), (blockY0, blockY1) = board["blockRange"]
+        return { (bx, by): MarkerPrinter.__BlockItems(board, bx, by) \
+            for bx in range(blockX0, blockX1) for by in range(blockY0, blockY1) }
 
-                for mx in range(markerSize):
-                    for my in range(markerSize+1):
-                        if ( markerBitMap[mx + borderBits, my + borderBits - 1] ^ markerBitMap[mx + borderBits, my + borderBits]):
-                            hEdges[mx, my] = True
+    def __DrawItems(context, items):
+        for item in items:
+            if(item[0] == "RECT"):
+                _, gray, x, y, width, height = item
+                context.set_source_rgba(gray, gray, gray, 1.0)
+                context.rectangle(x, y, width, height)
+                context.fill()
 
-                for mx in range(markerSize+1):
-                    for my in range(markerSize):
-                        if ( markerBitMap[mx + borderBits - 1, my + borderBits] ^ markerBitMap[mx + borderBits, my + borderBits]):
-                            vEdges[mx, my] = True
-
-                # Use for debug, check edge or position is correct or not
-                if(MarkerPrinter.debugMode is not None):
-                    if(MarkerPrinter.debugMode.upper() == "LINE"):
-                        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                        context.set_line_width(unitLength * 0.1)
-                        for mx in range(markerSize+1):
-                            for my in range(markerSize+1):
-                                if(hEdges[mx, my]):
-                                    context.move_to(originX + unitLength * (mx + borderBits    ), originY + unitLength * (my + borderBits    ))
-                                    context.line_to(originX + unitLength * (mx + borderBits + 1), originY + unitLength * (my + borderBits    ))
-                                    context.stroke()
-                                if(vEdges[mx, my]):
-                                    context.move_to(originX + unitLength * (mx + borderBits    ), originY + unitLength * (my + borderBits    ))
-                                    context.line_to(originX + unitLength * (mx + borderBits    ), originY + unitLength * (my + borderBits + 1))
-                                    context.stroke()
-
-                    elif(MarkerPrinter.debugMode.upper() == "BLOCK"):
-                        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                        for mx in range(markerSize):
-                            for my in range(markerSize):
-                                if(markerBitMap[mx + borderBits, my + borderBits]):
-                                    context.rectangle(
-                                        originX + unitLength * (mx + borderBits),
-                                        originY + unitLength * (my + borderBits),
-                                        unitLength, unitLength)
-                                    context.fill()
+            elif(item[0] == "LINE"):
+                _, gray, x0, y0, x1, y1, lineWidth = item
+                context.set_source_rgba(gray, gray, gray, 1.0)
+                context.set_line_width(lineWidth)
+                context.move_to(x0, y0)
+                context.line_to(x1, y1)
+                context.stroke()
+
+            elif(item[0] == "GLYPH"):
+                _, glyph, x, y, unitLength = item
+                MarkerPrinter.DrawGlyph(context, glyph, x, y, unitLength)
+
+    def __Board(mode, chessboardSize, squareLength, boardSize, pageBorder, dictionary = None, markerLength = None, borderBits = 1, firstMarkerID = 0, separation = 0):
+        # Lengths are in points
+        return {
+            "mode": mode,
+            "dictionary": dictionary,
+            "markerLength": markerLength,
+            "borderBits": borderBits,
+            "chessboardSize": chessboardSize,
+            "squareLength": squareLength,
+            "firstMarkerID": firstMarkerID,
+            "separation": separation,
+            "boardSize": boardSize,
+            "pageBorder": pageBorder,
+            "pageSize": (boardSize[0] + pageBorder[0] * 2, boardSize[1] + pageBorder[1] * 2),
+            "blockRange": ((0, chessboardSize[0]), (0, chessboardSize[1])) }
+
+    def __ChessBoard(chessboardSize, squareLength, pageBorder):
+        return MarkerPrinter.__Board("CHESS", chessboardSize, squareLength,
+            (chessboardSize[0] * squareLength, chessboardSize[1] * squareLength), pageBorder)
+
+    def __ArucoBoard(dictionary, markerID, markerLength, borderBits, pageBorder):
+        return MarkerPrinter.__Board("ARUCO", (1, 1), markerLength,
+            (markerLength, markerLength), pageBorder,
+            dictionary = dictionary, markerLength = markerLength, borderBits = borderBits, firstMarkerID = markerID)
+
+    def __CharucoBoard(dictionary, chessboardSize, squareLength, markerLength, borderBits, pageBorder):
+        return MarkerPrinter.__Board("CHARUCO", chessboardSize, squareLength,
+            (chessboardSize[0] * squareLength, chessboardSize[1] * squareLength), pageBorder,
+            dictionary = dictionary, markerLength = markerLength, borderBits = borderBits)
+
+    def __ArucoGridBoard(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits, pageBorder):
+        return MarkerPrinter.__Board("ARUCOGRID", chessboardSize, markerLength + markerSeparation,
+            (chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation,
+            chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation), pageBorder,
+            dictionary = dictionary, markerLength = markerLength, borderBits = borderBits, firstMarkerID = firstMarker, separation = markerSeparation)
+
+    def __DrawSquares(context, board):
+        # Black chess squares of the block range as one even-odd path:
+        # the rows of one parity and the columns of the other, every square is covered by one of them
+        if not((board["mode"] == "CHESS") or (board["mode"] == "CHARUCO")):
+            return
+
+        (blockX0, blockX1), (blockY0, blockY1) = board["blockRange"]
+        squareLength = board["squareLength"]
+        chessboardSize = board["chessboardSize"]
+
+        context.set_source_rgba(0.0, 0.0, 0.0, 1.0)
+        for by in range(blockY0, blockY1):
+            if((by + chessboardSize[1]) % 2 == 1):
+                context.rectangle(blockX0 * squareLength, by * squareLength, (blockX1 - blockX0) * squareLength, squareLength)
+        for bx in range(blockX0, blockX1):
+            if(bx % 2 == 1):
+                context.rectangle(bx * squareLength, blockY0 * squareLength, squareLength, (blockY1 - blockY0) * squareLength)
+
+        MarkerPrinter.__SetFillRule(context, True)
+        context.fill()
+        MarkerPrinter.__SetFillRule(context, False)
+
+    def __DrawBoard(context, board, boardItems = None):
+        pageBorder = board["pageBorder"]
+
+        context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
+        context.rectangle(0, 0, board["pageSize"][0], board["pageSize"][1])
+        context.fill()
+
+        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
+        context.rectangle(pageBorder[0], pageBorder[1], board["boardSize"][0], board["boardSize"][1])
+        context.fill()
+
+        if(boardItems is None):
+            boardItems = MarkerPrinter.__BoardItems(board)
+
+        # Move the first block of the range to the page border
+        (blockX0, blockX1), (blockY0, blockY1) = board["blockRange"]
+        context.save()
+        context.translate(pageBorder[0] - blockX0 * board["squareLength"], pageBorder[1] - blockY0 * board["squareLength"])
+        MarkerPrinter.__DrawSquares(context, board)
+        for bx in range(blockX0, blockX1):
+            MarkerPrinter.CheckCancel()
+            for by in range(blockY0, blockY1):
+                MarkerPrinter.__DrawItems(context, boardItems.get((bx, by), ()))
+        context.restore()
+
+    def __SubBoards(board, subSize):
+        chessboardSize = board["chessboardSize"]
+        squareLength = board["squareLength"]
+        pageBorder = board["pageBorder"]
+
+        subDivide = (\
+            chessboardSize[0] // subSize[0] + int(chessboardSize[0] % subSize[0] > 0),
+            chessboardSize[1] // subSize[1] + int(chessboardSize[1] % subSize[1] > 0))
+
+        subChessboardBlockX = np.clip ( np.arange(0, subSize[0] * subDivide[0] + 1, subSize[0]), 0, chessboardSize[0]).tolist()
+        subChessboardBlockY = np.clip ( np.arange(0, subSize[1] * subDivide[1] + 1, subSize[1]), 0, chessboardSize[1]).tolist()
+
+        subChessboardSliceX = [float(block) * squareLength for block in subChessboardBlockX]
+        subChessboardSliceY = [float(block) * squareLength for block in subChessboardBlockY]
+
+        subChessboardSliceX[-1] -= board["separation"]
+        subChessboardSliceY[-1] -= board["separation"]
+
+        subBoards = []
+        for subXID in range(subDivide[0]):
+            for subYID in range(subDivide[1]):
+                subName = \
+                    "_X" + str(subChessboardBlockX[subXID]) + "_" + str(subChessboardBlockX[subXID+1]) + \
+                    "_Y" + str(subChessboardBlockY[subYID]) + "_" + str(subChessboardBlockY[subYID+1])
+
+                subBoardSize = (
+                    subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID],
+                    subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID])
+
+                subBoard = dict(board)
+                subBoard["boardSize"] = subBoardSize
+                subBoard["pageSize"] = (subBoardSize[0] + pageBorder[0] * 2, subBoardSize[1] + pageBorder[1] * 2)
+                subBoard["blockRange"] = (
+                    (subChessboardBlockX[subXID], subChessboardBlockX[subXID+1]),
+                    (subChessboardBlockY[subYID], subChessboardBlockY[subYID+1]))
+                subBoards.append((subName, subBoard))
+
+        return subBoards
+
+    def __BoardFiles(filePath, board, subSize, tilesOnly = False, subPages = False):
+        # Files and their pages, the full board first, then every tile in column major order
+        # Every file draws its blocks from the same items, tiles only carry the items of their blocks
+        path, nameExt = os.path.split(filePath)
+        name, ext = os.path.splitext(nameExt)
+
+        boardItems = MarkerPrinter.__BoardItems(board)
 
+        boardFiles = []
+        if not(tilesOnly):
+            boardFiles.append((filePath, [(board, boardItems)]))
+
+        tiles = []
+        if(subSize is not None):
+            tilePages = []
+            for subName, subBoard in MarkerPrinter.__SubBoards(board, subSize):
+                (blockX0, blockX1), (blockY0, blockY1) = subBoard["blockRange"]
+                subItems = { (bx, by): boardItems[(bx, by)] \
+                    for bx in range(blockX0, blockX1) for by in range(blockY0, blockY1) }
+
+                if(subPages):
+                    tilePages.append((subBoard, subItems))
+                    tiles.append({ "tile": subName[1:], "blockRange": subBoard["blockRange"], "page": len(tilePages) })
                 else:
-                    while(True):
-                        found = False
-
-                        # Find start position
-                        sx = 0
-                        sy = 0
-                        for my in range(markerSize):
-                            for mx in range(markerSize):
-                                if(hEdges[mx, my]):
-                                    found = True
-                                    sx = mx
-                                    sy = my
-                                    if(markerBitMap[sx + borderBits, sy + borderBits - 1]):
-                                        context.set_source_rgba(0.0, 0.0, 0.0, 1.0)
-                                    else:
-                                        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                                    break
-                            if(found):
-                                break
-
-                        context.move_to (originX + unitLength * (sx + borderBits), originY + unitLength * (sy + borderBits))
-
-                        # Use wall follower maze solving algorithm to draw white part
-                        cx = sx
-                        cy = sy
-                        cd = 3 # 0 right, 1 down, 2 left, 3 up
-                        while(True):
-                            nd = (cd + 1)%4
-                            moved = False
-                            if(nd == 0):
-                                if(hEdges[cx, cy]):
-                                    hEdges[cx, cy] = False
-                                    cx = cx + 1
-                                    moved = True
-                            elif(nd == 1):
-                                if(vEdges[cx, cy]):
-                                    vEdges[cx, cy] = False
-                                    cy = cy + 1
-                                    moved = True
-                            elif(nd == 2):
-                                if(hEdges[cx - 1, cy]):
-                                    hEdges[cx - 1, cy] = False
-                                    cx = cx - 1
-                                    moved = True
-                            elif(nd == 3):
-                                if(vEdges[cx, cy - 1]):
-                                    vEdges[cx, cy - 1] = False
-                                    cy = cy - 1
-                                    moved = True
-
-                            if((cx == sx) and (cy == sy)):
-                                context.close_path ()
-                                break
-                            else:
-                                if(moved):
-                                    context.line_to(originX + unitLength * (cx + borderBits), originY + unitLength * (cy + borderBits))
-                                cd = nd
-
-                        if (found):
-                            context.fill()
-                        else:
-                            break
+                    subFilePath = os.path.join(path, name + subName + ext)
+                    boardFiles.append((subFilePath, [(subBoard, subItems)]))
+                    tiles.append({ "tile": subName[1:], "blockRange": subBoard["blockRange"], "file": subFilePath, "page": None })
+
+            if(subPages):
+                pagesFilePath = filePath if tilesOnly else os.path.join(path, name + "_tiles" + ext)
+                boardFiles.append((pagesFilePath, tilePages))
+                for tile in tiles:
+                    tile["file"] = pagesFilePath
+
+        return boardFiles, tiles
+
+    def __OutputKey(filePath, board, subSize, tilesOnly, subPages, dpi):
+        # Everything the bytes of the output files depend on
+        name, ext = os.path.splitext(filePath)
+        parts = {
+            "version": MarkerPrinter.LibraryVersion(),
+            "board": board,
+            "subSize": subSize,
+            "tilesOnly": tilesOnly,
+            "subPages": subPages,
+            "format": ext.lower(),
+            "debugMode": MarkerPrinter.debugMode,
+            "creationDate": MarkerPrinter.CreationDate() }
+
+        if(ext.upper() in (".PNG", ".TIF", ".TIFF")):
+            parts["dpi"] = dpi
+            parts["backend"] = MarkerPrinter.previewBackend
+            parts["rasterStripRows"] = MarkerPrinter.rasterStripRows
+        else:
+            parts["backend"] = MarkerPrinter.vectorBackend.get(ext.upper(), "CAIRO").upper()
+
+        if(parts["backend"] != "NATIVE"):
+            parts["cairo"] = cairo.cairo_version_string()
+        return parts
+
+    def __SaveBoardFiles(filePath, board, subSize, tilesOnly, subPages, jobs, dpi):
+        name, ext = os.path.splitext(filePath)
+
+        if(tilesOnly and (subSize is None)):
+            raise ValueError("tilesOnly needs subSize")
+
+        if(subPages and not((ext.upper() == ".PS") or (ext.upper() == ".PDF"))):
+            raise ValueError("subPages is not supported for " + ext[1:].lower() + ", should be: ps, pdf")
+
+        outputCache = MarkerPrinter.outputCache
+        if(outputCache is not None):
+            key = outputCache.Key(MarkerPrinter.__OutputKey(filePath, board, subSize, tilesOnly, subPages, dpi))
+            tiles = outputCache.Load(key, filePath)
+            if(tiles is not None):
+                return tiles
+
+        boardFiles, tiles = MarkerPrinter.__BoardFiles(filePath, board, subSize, tilesOnly, subPages)
+        MarkerPrinter.RunParallel(MarkerPrinter.SaveBoardPages, [(boardFilePath, pages, dpi) for boardFilePath, pages in boardFiles], jobs)
+
+        if(outputCache is not None):
+            outputCache.Store(key, filePath, [boardFilePath for boardFilePath, pages in boardFiles], tiles)
+        return tiles
+
+    def __Surface(ext):
+        if(MarkerPrinter.vectorBackend.get(ext.upper(), "CAIRO").upper() == "NATIVE"):
+            return MarkerPrinter.nativeSurface[ext.upper()]
+        return getattr(cairo, MarkerPrinter.surface[ext.upper()])
+
+    def __Context(surface):
+        # Native writers draw through their own context API
+        if(isinstance(surface, VectorWriter)):
+            return surface
+        return cairo.Context(surface)
+
+    def __RemoveOutput(filePath):
+        # An output may be a hard link into the output cache, truncating it would change the stored file
+        if(os.path.lexists(filePath)):
+            os.remove(filePath)
+
+    def SaveBoard(filePath, board, boardItems = None, dpi = 300):
+        MarkerPrinter.SaveBoardPages(filePath, [(board, boardItems)], dpi)
+
+    def SaveBoardPages(filePath, pages, dpi = 300):
+        # pages: iterable of (board, boardItems), drawn one by one, more than one page needs a PDF or PS file
+        # dpi is only used by PNG and TIFF files
+        name, ext = os.path.splitext(filePath)
+        pages = iter(pages)
+        page = next(pages)
+        nextPage = next(pages, None)
+
+        if(ext.upper() in (".PNG", ".TIF", ".TIFF")):
+            if(nextPage is not None):
+                raise ValueError("raster file has only one page, should be: ps, pdf")
+            MarkerPrinter.SaveBoardRaster(filePath, page[0], page[1], dpi)
+            return
+
+        pageSize = page[0]["pageSize"]
+        creationDate = MarkerPrinter.CreationDate()
+        MarkerPrinter.__RemoveOutput(filePath)
+        with MarkerPrinter.__Surface(ext) (filePath, pageSize[0], pageSize[1]) as surface:
+            native = isinstance(surface, VectorWriter)
+            if((creationDate is not None) and not(native) and (ext.upper() == ".PDF")):
+                surface.set_metadata(cairo.PDFMetadata.CREATE_DATE, creationDate)
+
+            if(nextPage is None):
+                MarkerPrinter.__DrawBoard(MarkerPrinter.__Context(surface), page[0], page[1])
+            else:
+                while(page is not None):
+                    board, boardItems = page
+                    surface.set_size(board["pageSize"][0], board["pageSize"][1])
+                    context = MarkerPrinter.__Context(surface)
+                    MarkerPrinter.__DrawBoard(context, board, boardItems)
+                    context.show_page()
+                    page, nextPage = nextPage, next(pages, None)
+
+        if((creationDate is not None) and not(native) and (ext.upper() == ".PS")):
+            MarkerPrinter.__SetPSCreationDate(filePath, creationDate)
+
+        if(MarkerPrinter.profiler is not None):
+            MarkerPrinter.profiler.Add("write", bytesWritten = os.path.getsize(filePath))
+
+    def __SetPSCreationDate(filePath, creationDate):
+        # cairo has no setting for the DSC creation date, it is overwritten in place with the same length
+        with open(filePath, "r+b") as file:
+            header = file.read(4096)
+            start = header.find(b"%%CreationDate: ")
+            if(start < 0):
+                return
+            start = start + len(b"%%CreationDate: ")
+            end = header.find(b"\n", start)
+            if(end < 0):
+                return
+            file.seek(start)
+            file.write(creationDate.encode("ascii")[:end - start].ljust(end - start))
+
+    def RunParallel(function, argsList, jobs = 1):
+        # jobs: 1 runs in this process, 0 uses every core
+        # Results keep the order of argsList, the error of the first failed task is raised once every task is done
+        argsList = list(argsList)
+
+        if(jobs is None):
+            jobs = 1
+        if(jobs < 0):
+            raise ValueError("jobs < 0")
+        if(jobs == 0):
+            jobs = os.cpu_count() or 1
+
+        if((jobs == 1) or (len(argsList) <= 1)):
+            return [function(*args) for args in argsList]
+
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers = min(jobs, len(argsList)),
+            initializer = InitMarkerPrinterWorker,
+            initargs = ({
+                "debugMode": MarkerPrinter.debugMode,
+                "previewBackend": MarkerPrinter.previewBackend,
+                "rasterStripRows": MarkerPrinter.rasterStripRows,
+                "vectorBackend": MarkerPrinter.vectorBackend,
+                "outputCache": MarkerPrinter.outputCache,
+                "creationDate": MarkerPrinter.creationDate },)) as executor:
+            # Workers are not profiled, a function wrapped by the profiler is sent by name
+            if(hasattr(function, "__wrapped__")):
+                futures = [executor.submit(RunMarkerPrinterTask, function.__wrapped__.__name__, *args) for args in argsList]
+            else:
+                futures = [executor.submit(function, *args) for args in argsList]
+            concurrent.futures.wait(futures)
+        return [future.result() for future in futures]
+
+    def __BitmapAxis(size, scale, pageBorder, boardLength, blockRange, squareLength, markerOffset, markerLength, cells, start = 0):
+        # Sample one axis at pixel centers: board area, block index, marker area and marker cell of every pixel
+        position = (np.arange(start, start + size) + 0.5) / scale - pageBorder
+        inArea = (position >= 0) & (position < boardLength)
+
+        local = np.floor(position / squareLength)
+        block = blockRange[0] + local.astype(np.int64)
+        inBlock = inArea & (block >= blockRange[0]) & (block < blockRange[1])
+
+        offset = position - local * squareLength - markerOffset
+        inMarker = inBlock & (offset >= 0) & (offset < markerLength)
+        cell = np.clip(np.floor(offset / (markerLength / cells)).astype(np.int64), 0, cells - 1)
+        return inArea, block, inBlock, inMarker, cell
+
+    def __RenderBitmap(board, dpi, rowRange = None):
+        # Gray levels as cairo renders them, 0.5 is stored as 128
+        # rowRange: (first, last) pixel rows to render, the whole page by default
+        MarkerPrinter.CheckCancel()
+        scale = dpi / 72.0
+        width = max(1, int(board["pageSize"][0] * scale))
+        height = max(1, int(board["pageSize"][1] * scale))
+
+        rowStart = 0
+        if(rowRange is not None):
+            rowStart, height = rowRange[0], rowRange[1] - rowRange[0]
+
+        mode = board["mode"]
+        chessboardSize = board["chessboardSize"]
+        squareLength = board["squareLength"]
+        markerLength = board["markerLength"]
+        if(markerLength is None):
+            markerLength = squareLength
+
+        markerOffset = 0.0
+        if(mode == "CHARUCO"):
+            markerOffset = (squareLength - markerLength) * 0.5
+
+        cells = 1
+        if(mode != "CHESS"):
+            borderBits = board["borderBits"]
+            arucoDictBits = np.asarray(MarkerPrinter.arucoDictBitsList[board["dictionary"]], dtype = bool)
+            cells = arucoDictBits.shape[1] + borderBits * 2
+
+        colArea, colBlock, colInBlock, colInMarker, colCell = MarkerPrinter.__BitmapAxis(
+            width, scale, board["pageBorder"][0], board["boardSize"][0], board["blockRange"][0], squareLength, markerOffset, markerLength, cells)
+        rowArea, rowBlock, rowInBlock, rowInMarker, rowCell = MarkerPrinter.__BitmapAxis(
+            height, scale, board["pageBorder"][1], board["boardSize"][1], board["blockRange"][1], squareLength, markerOffset, markerLength, cells, rowStart)
+
+        bitmap = np.full(shape = (height, width), fill_value = 128, dtype = np.uint8)
+        bitmap[rowArea[:, None] & colArea[None, :]] = 255
+
+        inBlock = rowInBlock[:, None] & colInBlock[None, :]
+        if ((mode == "ARUCO") or (mode == "ARUCOGRID")):
+            markerBlock = np.ones(shape = (height, width), dtype = bool)
+        else:
+            evenBlock = ((rowBlock[:, None] % 2) == 0) == ((colBlock[None, :] % 2) == 0)
+            if(chessboardSize[1] % 2 == 0):
+                markerBlock = evenBlock
+            else:
+                markerBlock = ~evenBlock
+
+        # Chessboard squares
+        bitmap[inBlock & ~markerBlock] = 0
+
+        # Marker cells, the marker bits are repeated over the cells of every marker block
+        if(mode != "CHESS"):
+            rows, cols = np.nonzero(inBlock & markerBlock & rowInMarker[:, None] & colInMarker[None, :])
+            blockX = colBlock[cols]
+            blockY = rowBlock[rows]
+            if  (mode == "CHARUCO"):
+                markerIDs = board["firstMarkerID"] + (blockY * chessboardSize[0] + blockX) // 2
+            elif (mode == "ARUCO"):
+                markerIDs = np.full(shape = rows.shape, fill_value = board["firstMarkerID"], dtype = np.int64)
+            else:
+                markerIDs = board["firstMarkerID"] + (blockY * chessboardSize[0] + blockX)
+
+            glyphs = np.pad(arucoDictBits, ((0, 0), (borderBits, borderBits), (borderBits, borderBits)))
+            bitmap[rows, cols] = np.where(glyphs[markerIDs, rowCell[rows], colCell[cols]], 255, 0)
+
+        return bitmap
+
+    def __PreviewBoard(board, dpi, backend = None):
+        if(backend is None):
+            backend = MarkerPrinter.previewBackend
+        backend = backend.upper()
+
+        if((backend == "NUMPY") and (MarkerPrinter.debugMode is not None)):
+            # The debug drawing only exists in the cairo path
+            backend = "CAIRO"
+
+        if(backend == "NUMPY"):
+            bitmap = MarkerPrinter.__RenderBitmap(board, dpi)
+            with ProfileStage("decode"):
+                return Image.fromarray(bitmap).convert("RGBA")
+
+        elif(backend == "CAIRO"):
+            # Draw straight onto an image surface, no file and no PNG encode/decode
+            scale = dpi / 72.0
+            width = max(1, int(board["pageSize"][0] * scale))
+            height = max(1, int(board["pageSize"][1] * scale))
+
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+            context = cairo.Context(surface)
+            context.scale(scale, scale)
+            MarkerPrinter.__DrawBoard(context, board)
+            with ProfileStage("flush"):
+                surface.flush()
+
+            # FORMAT_ARGB32 pixels are native endian 32 bits words
+            with ProfileStage("decode"):
+                rawMode = "BGRA" if (sys.byteorder == "little") else "ARGB"
+                prevImage = Image.frombuffer("RGBA", (width, height), bytes(surface.get_data()), "raw", rawMode, surface.get_stride(), 1)
+            surface.finish()
+            return prevImage
+
+        elif(backend == "SVG"):
+            # Render through a temporary SVG file and cairosvg
+            import tempfile
+            from cairosvg import svg2png
+
+            prevImage = None
+            with tempfile.TemporaryDirectory() as tmpdirname:
+                with cairo.SVGSurface(os.path.join(tmpdirname, "tempSVG.svg"), board["pageSize"][0], board["pageSize"][1]) as surface:
+                    MarkerPrinter.__DrawBoard(cairo.Context(surface), board)
+
+                with open(os.path.join(tmpdirname, "tempSVG.svg")) as file:
+                    with ProfileStage("svg2png"):
+                        pngBytes = svg2png(bytestring=file.read(), dpi=dpi)
+                    with ProfileStage("decode"):
+                        prevImage = Image.open(io.BytesIO(pngBytes))
+                        prevImage.load()
+
+            return prevImage
 
         else:
-            originX = (blockX - originX) * squareLength + pageBorderX
-            originY = (blockY - originY) * squareLength + pageBorderY
-            context.set_source_rgba(0.0, 0.0, 0.0, 1.0)
-            context.rectangle(originX, originY, squareLength, squareLength)
-            context.fill()
+            raise ValueError("preview backend is not supported, should be: CAIRO, NUMPY, SVG")
+
+    def __RenderStrips(board, dpi, boardItems = None, backend = None):
+        # Yield (first row, uint8 gray rows) strips of rasterStripRows rows, top to bottom
+        if(backend is None):
+            backend = MarkerPrinter.previewBackend
+        backend = backend.upper()
+
+        if((backend != "NUMPY") or (MarkerPrinter.debugMode is not None)):
+            # cairosvg renders whole pages only
+            backend = "CAIRO"
+
+        scale = dpi / 72.0
+        width = max(1, int(board["pageSize"][0] * scale))
+        height = max(1, int(board["pageSize"][1] * scale))
+        stripRows = max(1, int(MarkerPrinter.rasterStripRows))
+
+        if((backend == "CAIRO") and (boardItems is None)):
+            boardItems = MarkerPrinter.__BoardItems(board)
 
-    def __CheckChessMarkerImage(chessboardSize, squareLength, subSize=None, pageBorder=(0,0)):
+        for rowStart in range(0, height, stripRows):
+            rowEnd = min(height, rowStart + stripRows)
+
+            if(backend == "NUMPY"):
+                yield rowStart, MarkerPrinter.__RenderBitmap(board, dpi, (rowStart, rowEnd))
+
+            else:
+                # Only the block rows under the strip are drawn
+                squareLength = board["squareLength"]
+                blockY0 = board["blockRange"][1][0]
+                stripBlockY0 = blockY0 + math.floor((rowStart / scale - board["pageBorder"][1]) / squareLength) - 1
+                stripBlockY1 = blockY0 + math.ceil((rowEnd / scale - board["pageBorder"][1]) / squareLength) + 1
+                stripItems = { key: items for key, items in boardItems.items() if (stripBlockY0 <= key[1] < stripBlockY1) }
+
+                surface = cairo.ImageSurface(cairo.FORMAT_RGB24, width, rowEnd - rowStart)
+                context = cairo.Context(surface)
+                context.translate(0, -rowStart)
+                context.scale(scale, scale)
+                MarkerPrinter.__DrawBoard(context, board, stripItems)
+                surface.flush()
+
+                # Gray pixels, every color byte of the 32 bits words holds the level
+                pixels = np.frombuffer(bytes(surface.get_data()), dtype = np.uint8).reshape(rowEnd - rowStart, surface.get_stride())
+                yield rowStart, np.ascontiguousarray(pixels[:, 1:width * 4:4])
+                surface.finish()
+
+    def __PNGChunk(file, chunkType, data):
+        file.write(struct.pack(">I", len(data)))
+        file.write(chunkType)
+        file.write(data)
+        file.write(struct.pack(">I", zlib.crc32(chunkType + data) & 0xffffffff))
+
+    def __SavePNG(filePath, width, height, dpi, strips):
+        # 8 bits gray, one IDAT chunk per compressed strip
+        with open(filePath, "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n")
+            MarkerPrinter.__PNGChunk(file, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+            pixelsPerMeter = int(round(dpi / 0.0254))
+            MarkerPrinter.__PNGChunk(file, b"pHYs", struct.pack(">IIB", pixelsPerMeter, pixelsPerMeter, 1))
+
+            compressor = zlib.compressobj(6)
+            for rowStart, rows in strips:
+                # Filter type 0 before every row
+                data = compressor.compress(np.hstack((np.zeros((rows.shape[0], 1), dtype = np.uint8), rows)).tobytes())
+                if(len(data) > 0):
+                    MarkerPrinter.__PNGChunk(file, b"IDAT", data)
+            MarkerPrinter.__PNGChunk(file, b"IDAT", compressor.flush())
+            MarkerPrinter.__PNGChunk(file, b"IEND", b"")
+
+    def __SaveTIFF(filePath, width, height, dpi, strips):
+        # Uncompressed 8 bits gray, every strip size is known before the pixels are rendered
+        stripRows = max(1, int(MarkerPrinter.rasterStripRows))
+        stripCount = (height + stripRows - 1) // stripRows
+        stripByteCounts = [width * (min(height, rowStart + stripRows) - rowStart) for rowStart in range(0, height, stripRows)]
+
+        if(width * height + 1024 + stripCount * 8 >= 2**32):
+            raise ValueError("image is too large for tiff")
+
+        tagCount = 12
+        ifdOffset = 8
+        stripOffsetsOffset = ifdOffset + 2 + tagCount * 12 + 4
+        stripByteCountsOffset = stripOffsetsOffset + stripCount * 4
+        resolutionOffset = stripByteCountsOffset + stripCount * 4
+        dataOffset = resolutionOffset + 16
+
+        stripOffsets = [dataOffset]
+        for byteCount in stripByteCounts[:-1]:
+            stripOffsets.append(stripOffsets[-1] + byteCount)
+
+        def Tag(tag, fieldType, count, value):
+            if(fieldType == 3):
+                return struct.pack("<HHIHH", tag, fieldType, count, value, 0)
+            return struct.pack("<HHII", tag, fieldType, count, value)
+
+        with open(filePath, "wb") as file:
+            file.write(struct.pack("<2sHI", b"II", 42, ifdOffset))
+            file.write(struct.pack("<H", tagCount))
+            file.write(Tag(256, 4, 1, width))
+            file.write(Tag(257, 4, 1, height))
+            file.write(Tag(258, 3, 1, 8))
+            file.write(Tag(259, 3, 1, 1))
+            file.write(Tag(262, 3, 1, 1))
+            file.write(Tag(273, 4, stripCount, stripOffsets[0] if (stripCount == 1) else stripOffsetsOffset))
+            file.write(Tag(277, 3, 1, 1))
+            file.write(Tag(278, 4, 1, stripRows))
+            file.write(Tag(279, 4, stripCount, stripByteCounts[0] if (stripCount == 1) else stripByteCountsOffset))
+            file.write(Tag(282, 5, 1, resolutionOffset))
+            file.write(Tag(283, 5, 1, resolutionOffset + 8))
+            file.write(Tag(296, 3, 1, 2))
+            file.write(struct.pack("<I", 0))
+            file.write(struct.pack("<%dI" % stripCount, *stripOffsets))
+            file.write(struct.pack("<%dI" % stripCount, *stripByteCounts))
+            file.write(struct.pack("<IIII", int(round(dpi * 1000)), 1000, int(round(dpi * 1000)), 1000))
+
+            for rowStart, rows in strips:
+                file.write(rows.tobytes())
+
+    def SaveBoardRaster(filePath, board, boardItems = None, dpi = 300, backend = None):
+        # The page is rendered and encoded strip by strip, memory follows rasterStripRows, not the page area
+        name, ext = os.path.splitext(filePath)
+        scale = dpi / 72.0
+        width = max(1, int(board["pageSize"][0] * scale))
+        height = max(1, int(board["pageSize"][1] * scale))
+        strips = MarkerPrinter.__RenderStrips(board, dpi, boardItems, backend)
+
+        MarkerPrinter.__RemoveOutput(filePath)
+        if(ext.upper() == ".PNG"):
+            MarkerPrinter.__SavePNG(filePath, width, height, dpi, strips)
+        elif((ext.upper() == ".TIF") or (ext.upper() == ".TIFF")):
+            MarkerPrinter.__SaveTIFF(filePath, width, height, dpi, strips)
+        else:
+            raise ValueError("raster extention is not supported, should be: png, tif, tiff")
+
+        if(MarkerPrinter.profiler is not None):
+            MarkerPrinter.profiler.Add("write", bytesWritten = os.path.getsize(filePath))
+
+    def CheckChessMarkerImage(chessboardSize, squareLength, subSize=None, pageBorder=(0,0)):
         if(len(chessboardSize) != 2):
             raise ValueError("len(chessboardSize) != 2")
         else:
@@ -310,51 +1969,17 @@ class MarkerPrinter:
             if(subSizeY < 0):
                 raise ValueError("subSizeY < 0")
 
-    def PreviewChessMarkerImage(chessboardSize, squareLength, pageBorder=(0, 0), dpi=96):
-        MarkerPrinter.__CheckChessMarkerImage(chessboardSize, squareLength, pageBorder=pageBorder)
+    def PreviewChessMarkerImage(chessboardSize, squareLength, pageBorder=(0, 0), dpi=96, backend=None):
+        MarkerPrinter.CheckChessMarkerImage(chessboardSize, squareLength, pageBorder=pageBorder)
 
         squareLength = squareLength * MarkerPrinter.ptPerMeter
         pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
 
-        prevImage = None
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            with MarkerPrinter.surface[".SVG"] (
-                os.path.join(tmpdirname, "tempSVG.svg"),
-                chessboardSize[0] * squareLength + pageBorder[0] * 2,
-                chessboardSize[1] * squareLength + pageBorder[1] * 2) as surface:
-                context = cairo.Context(surface)
-
-                context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                context.rectangle(0, 0,
-                    chessboardSize[0] * squareLength + pageBorder[0] * 2,
-                    chessboardSize[1] * squareLength + pageBorder[1] * 2)
-                context.fill()
-
-                context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                context.rectangle(pageBorder[0], pageBorder[1],
-                    chessboardSize[0] * squareLength,
-                    chessboardSize[1] * squareLength)
-                context.fill()
+        board = MarkerPrinter.__ChessBoard(chessboardSize, squareLength, pageBorder)
+        return MarkerPrinter.__PreviewBoard(board, dpi, backend)
 
-                for bx in range(chessboardSize[0]):
-                    for by in range(chessboardSize[1]):
-                        MarkerPrinter.__DrawBlock(
-                            context = context,
-                            chessboardSize = chessboardSize,
-                            squareLength = squareLength,
-                            blockX = bx,
-                            blockY = by,
-                            pageBorderX = pageBorder[0],
-                            pageBorderY = pageBorder[1],
-                            mode = "CHESS")
-
-            with open(os.path.join(tmpdirname, "tempSVG.svg")) as file:
-                prevImage = Image.open(io.BytesIO(svg2png(bytestring=file.read(), dpi=dpi)))
-
-        return prevImage
-
-    def GenChessMarkerImage(filePath, chessboardSize, squareLength, subSize=None, pageBorder=(0, 0)):
-        MarkerPrinter.__CheckChessMarkerImage(chessboardSize, squareLength, subSize=subSize, pageBorder=pageBorder)
+    def GenChessMarkerImage(filePath, chessboardSize, squareLength, subSize=None, pageBorder=(0, 0), jobs=1, tilesOnly=False, subPages=False, dpi=300):
+        MarkerPrinter.CheckChessMarkerImage(chessboardSize, squareLength, subSize=subSize, pageBorder=pageBorder)
 
         squareLength = squareLength * MarkerPrinter.ptPerMeter
         pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
@@ -367,100 +1992,24 @@ class MarkerPrinter:
             if not(os.path.isdir(path)):
                 os.makedirs(path)
 
-        if((ext.upper() != ".SVG") and (ext.upper() != ".PS") and (ext.upper() != ".PDF")):
-            raise ValueError("file extention is not supported, should be: svg, ps, pdf")
+        if not(ext.upper() in (".SVG", ".PS", ".PDF", ".PNG", ".TIF", ".TIFF")):
+            raise ValueError("file extention is not supported, should be: svg, ps, pdf, png, tif, tiff")
 
-        # Draw
-        with MarkerPrinter.surface[ext.upper()] (
-            filePath,
-            chessboardSize[0] * squareLength + pageBorder[0] * 2,
-            chessboardSize[1] * squareLength + pageBorder[1] * 2) as surface:
-            context = cairo.Context(surface)
+        board = MarkerPrinter.__ChessBoard(chessboardSize, squareLength, pageBorder)
 
-            context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-            context.rectangle(0, 0,
-                chessboardSize[0] * squareLength + pageBorder[0] * 2,
-                chessboardSize[1] * squareLength + pageBorder[1] * 2)
-            context.fill()
-
-            context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-            context.rectangle(pageBorder[0], pageBorder[1],
-                chessboardSize[0] * squareLength,
-                chessboardSize[1] * squareLength)
-            context.fill()
-
-            for bx in range(chessboardSize[0]):
-                for by in range(chessboardSize[1]):
-                    MarkerPrinter.__DrawBlock(
-                        context = context,
-                        chessboardSize = chessboardSize,
-                        squareLength = squareLength,
-                        blockX = bx,
-                        blockY = by,
-                        pageBorderX = pageBorder[0],
-                        pageBorderY = pageBorder[1],
-                        mode = "CHESS" )
+        # Draw
+        return MarkerPrinter.__SaveBoardFiles(filePath, board, subSize, tilesOnly, subPages, jobs, dpi)
 
-        if(subSize is not None):
-            subDivide = (\
-                chessboardSize[0] // subSize[0] + int(chessboardSize[0] % subSize[0] > 0),
-                chessboardSize[1] // subSize[1] + int(chessboardSize[1] % subSize[1] > 0))
-
-            subChessboardBlockX = np.clip ( np.arange(0, subSize[0] * subDivide[0] + 1, subSize[0]), 0, chessboardSize[0])
-            subChessboardBlockY = np.clip ( np.arange(0, subSize[1] * subDivide[1] + 1, subSize[1]), 0, chessboardSize[1])
-
-            subChessboardSliceX = subChessboardBlockX.astype(np.float) * squareLength
-            subChessboardSliceY = subChessboardBlockY.astype(np.float) * squareLength
-
-            for subXID in range(subDivide[0]):
-                for subYID in range(subDivide[1]):
-                    subName = name + \
-                        "_X" + str(subChessboardBlockX[subXID]) + "_" + str(subChessboardBlockX[subXID+1]) + \
-                        "_Y" + str(subChessboardBlockY[subYID]) + "_" + str(subChessboardBlockY[subYID+1])
-
-                    with MarkerPrinter.surface[ext.upper()](
-                        os.path.join(path, subName + ext),
-                        subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID] + pageBorder[0] * 2,
-                        subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID] + pageBorder[1] * 2) as surface:
-                        context = cairo.Context(surface)
-
-                        context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                        context.rectangle(0, 0,
-                            subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID] + pageBorder[0] * 2,
-                            subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID] + pageBorder[1] * 2)
-                        context.fill()
-
-                        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                        context.rectangle(pageBorder[0], pageBorder[1],
-                            subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID],
-                            subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID])
-                        context.fill()
-
-                        for bx in range(subChessboardBlockX[subXID+1] - subChessboardBlockX[subXID]):
-                            for by in range(subChessboardBlockY[subYID+1] - subChessboardBlockY[subYID]):
-                                MarkerPrinter.__DrawBlock(
-                                    context = context,
-                                    chessboardSize = chessboardSize,
-                                    squareLength = squareLength,
-                                    blockX = subChessboardBlockX[subXID] + bx,
-                                    blockY = subChessboardBlockY[subYID] + by,
-                                    originX = subChessboardBlockX[subXID],
-                                    originY = subChessboardBlockY[subYID],
-                                    pageBorderX = pageBorder[0],
-                                    pageBorderY = pageBorder[1],
-                                    mode = "CHESS" )
-
-
-    def __CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=1, pageBorder=(0, 0)):
+    def CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=1, pageBorder=(0, 0)):
         if(len(pageBorder) != 2):
             raise ValueError("len(pageBorder) != 2")
         else:
             pageBorderX, pageBorderY = pageBorder
 
-        if not (dictionary in MarkerPrinter.arucoDictBytesList):
+        if not (dictionary in MarkerPrinter.arucoDictBitsList):
             raise ValueError("dictionary is not support")
 
-        if(MarkerPrinter.arucoDictBytesList[dictionary].shape[0] <= markerID ):
+        if(MarkerPrinter.arucoDictBitsList.MarkerCount(dictionary) <= markerID ):
             raise ValueError("markerID is not in aruce dictionary")
 
         if(markerID < 0):
@@ -478,52 +2027,126 @@ class MarkerPrinter:
         if(pageBorderY < 0):
             raise ValueError("pageBorderY < 0")
 
-    def PreviewArucoMarkerImage(dictionary, markerID, markerLength, borderBits=1, pageBorder=(0, 0), dpi=96):
-        MarkerPrinter.__CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder=pageBorder)
+    def PreviewArucoMarkerImage(dictionary, markerID, markerLength, borderBits=1, pageBorder=(0, 0), dpi=96, backend=None):
+        MarkerPrinter.CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder=pageBorder)
 
         markerLength = markerLength * MarkerPrinter.ptPerMeter
         pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
 
-        prevImage = None
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            with MarkerPrinter.surface[".SVG"] (
-                os.path.join(tmpdirname, "tempSVG.svg"),
-                markerLength + pageBorder[0] * 2,
-                markerLength + pageBorder[1] * 2) as surface:
-                context = cairo.Context(surface)
+        board = MarkerPrinter.__ArucoBoard(dictionary, markerID, markerLength, borderBits, pageBorder)
+        return MarkerPrinter.__PreviewBoard(board, dpi, backend)
 
-                context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                context.rectangle(0, 0,
-                    markerLength + pageBorder[0] * 2,
-                    markerLength + pageBorder[1] * 2)
-                context.fill()
+    def GenArucoMarkerImage(filePath, dictionary, markerID, markerLength, borderBits=1, pageBorder=(0, 0), dpi=300):
+        MarkerPrinter.CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder=pageBorder)
 
-                context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                context.rectangle(pageBorder[0], pageBorder[1],
-                    markerLength,
-                    markerLength)
-                context.fill()
+        markerLength = markerLength * MarkerPrinter.ptPerMeter
+        pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
 
-                MarkerPrinter.__DrawBlock(
-                    context = context,
-                    dictionary = dictionary,
-                    markerLength = markerLength,
-                    borderBits = borderBits,
-                    firstMarkerID = markerID,
-                    pageBorderX = pageBorder[0],
-                    pageBorderY = pageBorder[1],
-                    mode = "ARUCO")
+        # Check
+        path, nameExt = os.path.split(filePath)
+        name, ext = os.path.splitext(nameExt)
 
-            with open(os.path.join(tmpdirname, "tempSVG.svg")) as file:
-                prevImage = Image.open(io.BytesIO(svg2png(bytestring=file.read(), dpi=dpi)))
+        if(len(path) > 0):
+            if not(os.path.isdir(path)):
+                os.makedirs(path)
+
+        if not(ext.upper() in (".SVG", ".PS", ".PDF", ".PNG", ".TIF", ".TIFF")):
+            raise ValueError("file extention is not supported, should be: svg, ps, pdf, png, tif, tiff")
+
+        board = MarkerPrinter.__ArucoBoard(dictionary, markerID, markerLength, borderBits, pageBorder)
+
+        # Draw
+        MarkerPrinter.__SaveBoardFiles(filePath, board, None, False, False, 1, dpi)
+
+    def GenArucoMarkerImages(filePath, dictionary, markerIDs, markerLength, borderBits=1, pageBorder=(0, 0), jobs=1, dpi=300):
+        # One file per marker, named with the marker ID
+        markerIDs = list(markerIDs)
+        if(len(markerIDs) == 0):
+            raise ValueError("markerIDs is empty")
 
-        return prevImage
+        for markerID in markerIDs:
+            MarkerPrinter.CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder=pageBorder)
 
-    def GenArucoMarkerImage(filePath, dictionary, markerID, markerLength, borderBits=1, pageBorder=(0, 0)):
-        MarkerPrinter.__CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder=pageBorder)
+        path, nameExt = os.path.split(filePath)
+        name, ext = os.path.splitext(nameExt)
+
+        MarkerPrinter.RunParallel(MarkerPrinter.GenArucoMarkerImage, [ \
+            (os.path.join(path, name + "_" + str(markerID) + ext), dictionary, markerID, markerLength, borderBits, pageBorder, dpi) \
+            for markerID in markerIDs], jobs)
+
+    def ParseMarkerIDs(text):
+        # "3", "0,4,7" or "0-9,20-29", ranges include both ends
+        markerIDs = []
+        for token in str(text).split(","):
+            token = token.strip()
+            if(len(token) == 0):
+                continue
+            if("-" in token):
+                first, last = token.split("-", 1)
+                first, last = int(first), int(last)
+                if(last < first):
+                    raise ValueError("marker ID range is empty: " + token)
+                markerIDs.extend(range(first, last + 1))
+            else:
+                markerIDs.append(int(token))
+        return markerIDs
+
+    def __CheckArucoMarkerSheet(dictionary, markerIDs, markerLength, markerSeparation, borderBits=1, paperSize=(0.210, 0.297), margin=(0.01, 0.01)):
+        if(len(markerIDs) == 0):
+            raise ValueError("markerIDs is empty")
+
+        for markerID in markerIDs:
+            MarkerPrinter.CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits)
+
+        if(markerSeparation < 0):
+            raise ValueError("markerSeparation < 0")
+
+        if(len(paperSize) != 2):
+            raise ValueError("len(paperSize) != 2")
+        else:
+            paperSizeX, paperSizeY = paperSize
+
+            if(paperSizeX <= 0):
+                raise ValueError("paperSizeX <= 0")
+
+            if(paperSizeY <= 0):
+                raise ValueError("paperSizeY <= 0")
+
+        if(len(margin) != 2):
+            raise ValueError("len(margin) != 2")
+        else:
+            marginX, marginY = margin
+
+            if(marginX < 0):
+                raise ValueError("marginX < 0")
+
+            if(marginY < 0):
+                raise ValueError("marginY < 0")
+
+    def __SheetPages(dictionary, markerIDs, markerLength, markerSeparation, borderBits, paperSize, margin, sheetSize):
+        # One page at a time, markers from left to right then top to bottom
+        perPage = sheetSize[0] * sheetSize[1]
+        step = markerLength + markerSeparation
+        for first in range(0, len(markerIDs), perPage):
+            board = MarkerPrinter.__Board("ARUCOSHEET", sheetSize, step, paperSize, (0, 0),
+                dictionary = dictionary, markerLength = markerLength, borderBits = borderBits, separation = markerSeparation)
+
+            boardItems = {}
+            for i, markerID in enumerate(markerIDs[first:first + perPage]):
+                bx, by = i % sheetSize[0], i // sheetSize[0]
+                boardItems[(bx, by)] = MarkerPrinter.__MarkerItems(dictionary, markerID, markerLength, borderBits,
+                    margin[0] + bx * step, margin[1] + by * step)
+            yield board, boardItems
+
+    def GenArucoMarkerSheet(filePath, dictionary, markerIDs, markerLength, markerSeparation=0.01, borderBits=1, paperSize=(0.210, 0.297), margin=(0.01, 0.01)):
+        # As many markers as fit on each page of one file, the paper is A4 by default
+        markerIDs = [int(markerID) for markerID in markerIDs]
+        MarkerPrinter.__CheckArucoMarkerSheet(dictionary, markerIDs, markerLength, markerSeparation, borderBits=borderBits, paperSize=paperSize, margin=margin)
 
         markerLength = markerLength * MarkerPrinter.ptPerMeter
-        pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
+        markerSeparation = markerSeparation * MarkerPrinter.ptPerMeter
+        paperSize = (paperSize[0] * MarkerPrinter.ptPerMeter, paperSize[1] * MarkerPrinter.ptPerMeter)
+        margin = (margin[0] * MarkerPrinter.ptPerMeter, margin[1] * MarkerPrinter.ptPerMeter)
 
         # Check
         path, nameExt = os.path.split(filePath)
@@ -536,36 +2159,27 @@ class MarkerPrinter:
         if((ext.upper() != ".SVG") and (ext.upper() != ".PS") and (ext.upper() != ".PDF")):
             raise ValueError("file extention is not supported, should be: svg, ps, pdf")
 
+        sheetSize = (
+            int((paperSize[0] - margin[0] * 2 + markerSeparation) // (markerLength + markerSeparation)),
+            int((paperSize[1] - margin[1] * 2 + markerSeparation) // (markerLength + markerSeparation)))
+
+        if((sheetSize[0] <= 0) or (sheetSize[1] <= 0)):
+            raise ValueError("marker does not fit in the paper")
+
+        perPage = sheetSize[0] * sheetSize[1]
+        pages = [{ "page": page + 1, "markerIDs": markerIDs[page * perPage:(page + 1) * perPage] } \
+            for page in range((len(markerIDs) + perPage - 1) // perPage)]
+
+        if((len(pages) > 1) and (ext.upper() == ".SVG")):
+            raise ValueError("svg has only one page, should be: ps, pdf")
+
         # Draw
-        with MarkerPrinter.surface[ext.upper()] (
-            filePath,
-            markerLength + pageBorder[0] * 2,
-            markerLength + pageBorder[1] * 2) as surface:
-            context = cairo.Context(surface)
+        MarkerPrinter.SaveBoardPages(filePath,
+            MarkerPrinter.__SheetPages(dictionary, markerIDs, markerLength, markerSeparation, borderBits, paperSize, margin, sheetSize))
+
+        return pages
 
-            context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-            context.rectangle(0, 0,
-                markerLength + pageBorder[0] * 2,
-                markerLength + pageBorder[1] * 2)
-            context.fill()
-
-            context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-            context.rectangle(pageBorder[0], pageBorder[1],
-                markerLength,
-                markerLength)
-            context.fill()
-
-            MarkerPrinter.__DrawBlock(
-                context = context,
-                dictionary = dictionary,
-                markerLength = markerLength,
-                borderBits = borderBits,
-                firstMarkerID = markerID,
-                pageBorderX = pageBorder[0],
-                pageBorderY = pageBorder[1],
-                mode = "ARUCO")
-
-    def __CheckCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=1, subSize=None, pageBorder=(0, 0)):
+    def CheckCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=1, subSize=None, pageBorder=(0, 0)):
         if(len(chessboardSize) != 2):
             raise ValueError("len(chessboardSize) != 2")
         else:
@@ -576,10 +2190,10 @@ class MarkerPrinter:
         else:
             pageBorderX, pageBorderY = pageBorder
 
-        if not (dictionary in MarkerPrinter.arucoDictBytesList):
+        if not (dictionary in MarkerPrinter.arucoDictBitsList):
             raise ValueError("dictionary is not support")
 
-        if(MarkerPrinter.arucoDictBytesList[dictionary].shape[0] < (( sizeX * sizeY ) // 2)):
+        if(MarkerPrinter.arucoDictBitsList.MarkerCount(dictionary) < (( sizeX * sizeY ) // 2)):
             raise ValueError("aruce dictionary is not enough for your board size")
 
         if(sizeX <= 1):
@@ -615,55 +2229,18 @@ class MarkerPrinter:
             if(subSizeY < 0):
                 raise ValueError("subSizeY < 0")
 
-    def PreviewCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=1, pageBorder=(0, 0), dpi=96):
-        MarkerPrinter.__CheckCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=borderBits, pageBorder=pageBorder)
+    def PreviewCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=1, pageBorder=(0, 0), dpi=96, backend=None):
+        MarkerPrinter.CheckCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=borderBits, pageBorder=pageBorder)
 
         squareLength = squareLength * MarkerPrinter.ptPerMeter
         markerLength = markerLength * MarkerPrinter.ptPerMeter
         pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
 
-        prevImage = None
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            with MarkerPrinter.surface[".SVG"] (
-                os.path.join(tmpdirname, "tempSVG.svg"),
-                chessboardSize[0] * squareLength + pageBorder[0] * 2,
-                chessboardSize[1] * squareLength + pageBorder[1] * 2) as surface:
-                context = cairo.Context(surface)
-
-                context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                context.rectangle(0, 0,
-                    chessboardSize[0] * squareLength + pageBorder[0] * 2,
-                    chessboardSize[1] * squareLength + pageBorder[1] * 2)
-                context.fill()
-
-                context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                context.rectangle(pageBorder[0], pageBorder[1],
-                    chessboardSize[0] * squareLength,
-                    chessboardSize[1] * squareLength)
-                context.fill()
+        board = MarkerPrinter.__CharucoBoard(dictionary, chessboardSize, squareLength, markerLength, borderBits, pageBorder)
+        return MarkerPrinter.__PreviewBoard(board, dpi, backend)
 
-                for bx in range(chessboardSize[0]):
-                    for by in range(chessboardSize[1]):
-                        MarkerPrinter.__DrawBlock(
-                            context = context,
-                            dictionary = dictionary,
-                            markerLength = markerLength,
-                            borderBits = borderBits,
-                            chessboardSize = chessboardSize,
-                            squareLength = squareLength,
-                            blockX = bx,
-                            blockY = by,
-                            pageBorderX = pageBorder[0],
-                            pageBorderY = pageBorder[1],
-                            mode = "CHARUCO")
-
-            with open(os.path.join(tmpdirname, "tempSVG.svg")) as file:
-                prevImage = Image.open(io.BytesIO(svg2png(bytestring=file.read(), dpi=dpi)))
-
-        return prevImage
-
-    def GenCharucoMarkerImage(filePath, dictionary, chessboardSize, squareLength, markerLength, borderBits=1, subSize=None, pageBorder=(0, 0)):
-        MarkerPrinter.__CheckCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=borderBits, subSize=subSize, pageBorder=pageBorder)
+    def GenCharucoMarkerImage(filePath, dictionary, chessboardSize, squareLength, markerLength, borderBits=1, subSize=None, pageBorder=(0, 0), jobs=1, tilesOnly=False, subPages=False, dpi=300):
+        MarkerPrinter.CheckCharucoMarkerImage(dictionary, chessboardSize, squareLength, markerLength, borderBits=borderBits, subSize=subSize, pageBorder=pageBorder)
 
         squareLength = squareLength * MarkerPrinter.ptPerMeter
         markerLength = markerLength * MarkerPrinter.ptPerMeter
@@ -677,96 +2254,15 @@ class MarkerPrinter:
             if not(os.path.isdir(path)):
                 os.makedirs(path)
 
-        if((ext.upper() != ".SVG") and (ext.upper() != ".PS") and (ext.upper() != ".PDF")):
-            raise ValueError("file extention is not supported, should be: svg, ps, pdf")
+        if not(ext.upper() in (".SVG", ".PS", ".PDF", ".PNG", ".TIF", ".TIFF")):
+            raise ValueError("file extention is not supported, should be: svg, ps, pdf, png, tif, tiff")
 
-        # Draw
-        with MarkerPrinter.surface[ext.upper()] (
-            filePath,
-            chessboardSize[0] * squareLength + pageBorder[0] * 2,
-            chessboardSize[1] * squareLength + pageBorder[1] * 2) as surface:
-            context = cairo.Context(surface)
+        board = MarkerPrinter.__CharucoBoard(dictionary, chessboardSize, squareLength, markerLength, borderBits, pageBorder)
 
-            context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-            context.rectangle(0, 0,
-                chessboardSize[0] * squareLength + pageBorder[0] * 2,
-                chessboardSize[1] * squareLength + pageBorder[1] * 2)
-            context.fill()
-
-            context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-            context.rectangle(pageBorder[0], pageBorder[1],
-                chessboardSize[0] * squareLength,
-                chessboardSize[1] * squareLength)
-            context.fill()
-
-            for bx in range(chessboardSize[0]):
-                for by in range(chessboardSize[1]):
-                    MarkerPrinter.__DrawBlock(
-                        context = context,
-                        dictionary = dictionary,
-                        markerLength = markerLength,
-                        borderBits = borderBits,
-                        chessboardSize = chessboardSize,
-                        squareLength = squareLength,
-                        blockX = bx,
-                        blockY = by,
-                        pageBorderX = pageBorder[0],
-                        pageBorderY = pageBorder[1],
-                        mode = "CHARUCO")
+        # Draw
+        return MarkerPrinter.__SaveBoardFiles(filePath, board, subSize, tilesOnly, subPages, jobs, dpi)
 
-        if(subSize is not None):
-            subDivide = (\
-                chessboardSize[0] // subSize[0] + int(chessboardSize[0] % subSize[0] > 0),
-                chessboardSize[1] // subSize[1] + int(chessboardSize[1] % subSize[1] > 0))
-
-            subChessboardBlockX = np.clip ( np.arange(0, subSize[0] * subDivide[0] + 1, subSize[0]), 0, chessboardSize[0])
-            subChessboardBlockY = np.clip ( np.arange(0, subSize[1] * subDivide[1] + 1, subSize[1]), 0, chessboardSize[1])
-
-            subChessboardSliceX = subChessboardBlockX.astype(np.float) * squareLength
-            subChessboardSliceY = subChessboardBlockY.astype(np.float) * squareLength
-
-            for subXID in range(subDivide[0]):
-                for subYID in range(subDivide[1]):
-                    subName = name + \
-                        "_X" + str(subChessboardBlockX[subXID]) + "_" + str(subChessboardBlockX[subXID+1]) + \
-                        "_Y" + str(subChessboardBlockY[subYID]) + "_" + str(subChessboardBlockY[subYID+1])
-
-                    with MarkerPrinter.surface[ext.upper()](
-                        os.path.join(path, subName + ext),
-                        subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID] + pageBorder[0] * 2,
-                        subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID] + pageBorder[1] * 2) as surface:
-                        context = cairo.Context(surface)
-
-                        context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                        context.rectangle(0, 0,
-                            subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID] + pageBorder[0] * 2,
-                            subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID] + pageBorder[1] * 2)
-                        context.fill()
-
-                        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                        context.rectangle(pageBorder[0], pageBorder[1],
-                            subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID],
-                            subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID])
-                        context.fill()
-
-                        for bx in range(subChessboardBlockX[subXID+1] - subChessboardBlockX[subXID]):
-                            for by in range(subChessboardBlockY[subYID+1] - subChessboardBlockY[subYID]):
-                                MarkerPrinter.__DrawBlock(
-                                    context = context,
-                                    dictionary = dictionary,
-                                    markerLength = markerLength,
-                                    borderBits = borderBits,
-                                    chessboardSize = chessboardSize,
-                                    squareLength = squareLength,
-                                    blockX = subChessboardBlockX[subXID] + bx,
-                                    blockY = subChessboardBlockY[subYID] + by,
-                                    originX = subChessboardBlockX[subXID],
-                                    originY = subChessboardBlockY[subYID],
-                                    pageBorderX = pageBorder[0],
-                                    pageBorderY = pageBorder[1],
-                                    mode = "CHARUCO")
-
-    def __CheckArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=1, subSize=None, pageBorder=(0, 0)):
+    def CheckArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=1, subSize=None, pageBorder=(0, 0)):
         if(len(chessboardSize) != 2):
             raise ValueError("len(chessboardSize) != 2")
         else:
@@ -777,10 +2273,10 @@ class MarkerPrinter:
         else:
             pageBorderX, pageBorderY = pageBorder
 
-        if not (dictionary in MarkerPrinter.arucoDictBytesList):
+        if not (dictionary in MarkerPrinter.arucoDictBitsList):
             raise ValueError("dictionary is not support")
 
-        if(MarkerPrinter.arucoDictBytesList[dictionary].shape[0] < (( sizeX * sizeY ) + firstMarker)):
+        if(MarkerPrinter.arucoDictBitsList.MarkerCount(dictionary) < (( sizeX * sizeY ) + firstMarker)):
             raise ValueError("aruce dictionary is not enough for your board size and firstMarker")
 
         if(sizeX <= 1):
@@ -813,56 +2309,18 @@ class MarkerPrinter:
             if(subSizeY < 0):
                 raise ValueError("subSizeY < 0")
 
-    def PreviewArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=1, pageBorder=(0, 0), dpi=96):
-        MarkerPrinter.__CheckArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=borderBits, pageBorder=pageBorder)
+    def PreviewArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=1, pageBorder=(0, 0), dpi=96, backend=None):
+        MarkerPrinter.CheckArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=borderBits, pageBorder=pageBorder)
 
         markerLength = markerLength * MarkerPrinter.ptPerMeter
         markerSeparation = markerSeparation * MarkerPrinter.ptPerMeter
         pageBorder = (pageBorder[0] * MarkerPrinter.ptPerMeter, pageBorder[1] * MarkerPrinter.ptPerMeter)
 
-        prevImage = None
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            with MarkerPrinter.surface[".SVG"] (
-                os.path.join(tmpdirname, "tempSVG.svg"),
-                chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation + pageBorder[0] * 2,
-                chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation + pageBorder[1] * 2) as surface:
-                context = cairo.Context(surface)
+        board = MarkerPrinter.__ArucoGridBoard(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits, pageBorder)
+        return MarkerPrinter.__PreviewBoard(board, dpi, backend)
 
-                context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                context.rectangle(0, 0,
-                    chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation + pageBorder[0] * 2,
-                    chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation + pageBorder[1] * 2)
-                context.fill()
-
-                context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                context.rectangle(pageBorder[0], pageBorder[1],
-                    chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation,
-                    chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation)
-                context.fill()
-
-                for bx in range(chessboardSize[0]):
-                    for by in range(chessboardSize[1]):
-                        MarkerPrinter.__DrawBlock(
-                            context = context,
-                            dictionary = dictionary,
-                            markerLength = markerLength,
-                            borderBits = borderBits,
-                            chessboardSize = chessboardSize,
-                            squareLength = markerLength + markerSeparation,
-                            firstMarkerID = firstMarker,
-                            blockX = bx,
-                            blockY = by,
-                            pageBorderX = pageBorder[0],
-                            pageBorderY = pageBorder[1],
-                            mode = "ARUCOGRID")
-
-            with open(os.path.join(tmpdirname, "tempSVG.svg")) as file:
-                prevImage = Image.open(io.BytesIO(svg2png(bytestring=file.read(), dpi=dpi)))
-
-        return prevImage
-
-    def GenArucoGridMarkerImage(filePath, dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=1, subSize=None, pageBorder=(0, 0)):
-        MarkerPrinter.__CheckArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=borderBits, subSize=subSize, pageBorder=pageBorder)
+    def GenArucoGridMarkerImage(filePath, dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=1, subSize=None, pageBorder=(0, 0), jobs=1, tilesOnly=False, subPages=False, dpi=300):
+        MarkerPrinter.CheckArucoGridMarkerImage(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits=borderBits, subSize=subSize, pageBorder=pageBorder)
 
         markerLength = markerLength * MarkerPrinter.ptPerMeter
         markerSeparation = markerSeparation * MarkerPrinter.ptPerMeter
@@ -876,101 +2334,176 @@ class MarkerPrinter:
             if not(os.path.isdir(path)):
                 os.makedirs(path)
 
-        if((ext.upper() != ".SVG") and (ext.upper() != ".PS") and (ext.upper() != ".PDF")):
-            raise ValueError("file extention is not supported, should be: svg, ps, pdf")
+        if not(ext.upper() in (".SVG", ".PS", ".PDF", ".PNG", ".TIF", ".TIFF")):
+            raise ValueError("file extention is not supported, should be: svg, ps, pdf, png, tif, tiff")
+
+        board = MarkerPrinter.__ArucoGridBoard(dictionary, chessboardSize, markerLength, markerSeparation, firstMarker, borderBits, pageBorder)
 
         # Draw
-        with MarkerPrinter.surface[ext.upper()] (
-            filePath,
-            chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation + pageBorder[0] * 2,
-            chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation + pageBorder[1] * 2) as surface:
-            context = cairo.Context(surface)
+        return MarkerPrinter.__SaveBoardFiles(filePath, board, subSize, tilesOnly, subPages, jobs, dpi)
 
-            context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-            context.rectangle(0, 0,
-                chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation + pageBorder[0] * 2,
-                chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation + pageBorder[1] * 2)
-            context.fill()
-
-            context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-            context.rectangle(pageBorder[0], pageBorder[1],
-                chessboardSize[0] * markerLength + (chessboardSize[0] - 1) * markerSeparation,
-                chessboardSize[1] * markerLength + (chessboardSize[1] - 1) * markerSeparation)
-            context.fill()
-
-            for bx in range(chessboardSize[0]):
-                for by in range(chessboardSize[1]):
-                    MarkerPrinter.__DrawBlock(
-                        context = context,
-                        dictionary = dictionary,
-                        markerLength = markerLength,
-                        borderBits = borderBits,
-                        chessboardSize = chessboardSize,
-                        squareLength = markerLength + markerSeparation,
-                        firstMarkerID = firstMarker,
-                        blockX = bx,
-                        blockY = by,
-                        pageBorderX = pageBorder[0],
-                        pageBorderY = pageBorder[1],
-                        mode = "ARUCOGRID")
+    # Parameters of a batch job, named as the command-line options, with the command-line defaults
+    batchJobDefaults = \
+        {
+            "dictionary": "DICT_ARUCO_ORIGINAL",
+            "size_x": 16,
+            "size_y": 9,
+            "square_length": 0.09,
+            "marker_length": 0.07,
+            "marker_separation": 0.02,
+            "marker_id": 0,
+            "first_marker": 0,
+            "border_bits": 1,
+            "sub_size_x": 0,
+            "sub_size_y": 0,
+            "page_border_x": 0,
+            "page_border_y": 0,
+            "tiles_only": False,
+            "sub_pages": False,
+            "dpi": 300,
+        }
 
-        if(subSize is not None):
-            subDivide = (\
-                chessboardSize[0] // subSize[0] + int(chessboardSize[0] % subSize[0] > 0),
-                chessboardSize[1] // subSize[1] + int(chessboardSize[1] % subSize[1] > 0))
-
-            subChessboardBlockX = np.clip ( np.arange(0, subSize[0] * subDivide[0] + 1, subSize[0]), 0, chessboardSize[0])
-            subChessboardBlockY = np.clip ( np.arange(0, subSize[1] * subDivide[1] + 1, subSize[1]), 0, chessboardSize[1])
-
-            subChessboardSliceX = subChessboardBlockX.astype(np.float) * (markerLength + markerSeparation)
-            subChessboardSliceY = subChessboardBlockY.astype(np.float) * (markerLength + markerSeparation)
-
-            subChessboardSliceX[-1] -= markerSeparation
-            subChessboardSliceY[-1] -= markerSeparation
-
-            for subXID in range(subDivide[0]):
-                for subYID in range(subDivide[1]):
-                    subName = name + \
-                        "_X" + str(subChessboardBlockX[subXID]) + "_" + str(subChessboardBlockX[subXID+1]) + \
-                        "_Y" + str(subChessboardBlockY[subYID]) + "_" + str(subChessboardBlockY[subYID+1])
-
-                    with MarkerPrinter.surface[ext.upper()](
-                        os.path.join(path, subName + ext),
-                        subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID] + pageBorder[0] * 2,
-                        subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID] + pageBorder[1] * 2) as surface:
-                        context = cairo.Context(surface)
-
-                        context.set_source_rgba(0.5, 0.5, 0.5, 1.0)
-                        context.rectangle(0, 0,
-                            subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID] + pageBorder[0] * 2,
-                            subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID] + pageBorder[1] * 2)
-                        context.fill()
-
-                        context.set_source_rgba(1.0, 1.0, 1.0, 1.0)
-                        context.rectangle(pageBorder[0], pageBorder[1],
-                            subChessboardSliceX[subXID+1] - subChessboardSliceX[subXID],
-                            subChessboardSliceY[subYID+1] - subChessboardSliceY[subYID])
-                        context.fill()
-
-                        for bx in range(subChessboardBlockX[subXID+1] - subChessboardBlockX[subXID]):
-                            for by in range(subChessboardBlockY[subYID+1] - subChessboardBlockY[subYID]):
-                                MarkerPrinter.__DrawBlock(
-                                    context = context,
-                                    dictionary = dictionary,
-                                    markerLength = markerLength,
-                                    borderBits = borderBits,
-                                    chessboardSize = chessboardSize,
-                                    squareLength = markerLength + markerSeparation,
-                                    firstMarkerID = firstMarker,
-                                    blockX = subChessboardBlockX[subXID] + bx,
-                                    blockY = subChessboardBlockY[subYID] + by,
-                                    originX = subChessboardBlockX[subXID],
-                                    originY = subChessboardBlockY[subYID],
-                                    pageBorderX = pageBorder[0],
-                                    pageBorderY = pageBorder[1],
-                                    mode = "ARUCOGRID")
+    def SubSize(chessboardSize, subSizeX, subSizeY):
+        # 0 disables the split along that axis
+        if(subSizeX > 0):
+            if(subSizeY > 0):
+                return (subSizeX, subSizeY)
+            else:
+                return (subSizeX, chessboardSize[1])
+        else:
+            if(subSizeY > 0):
+                return (chessboardSize[0], subSizeY)
+            else:
+                return None
+
+    def LoadBatchManifest(filePath):
+        name, ext = os.path.splitext(filePath)
+
+        if(ext.upper() == ".JSON"):
+            with open(filePath) as file:
+                jobs = json.load(file)
+            if(isinstance(jobs, dict)):
+                jobs = jobs.get("jobs", [])
+
+        elif(ext.upper() == ".CSV"):
+            with open(filePath, newline = "") as file:
+                jobs = [ \
+                    { key.strip(): value.strip() for key, value in row.items() if (key is not None) and (value is not None) and (value.strip() != "") } \
+                    for row in csv.DictReader(file) ]
+
+        else:
+            raise ValueError("manifest extention is not supported, should be: json, csv")
+
+        if not(isinstance(jobs, list)):
+            raise ValueError("manifest should be a list of jobs")
+
+        return jobs
+
+    def RunBatchJob(job):
+        jobType = str(job.get("type", "")).lower()
+        filePath = job.get("file", None)
+
+        if(filePath is None):
+            raise ValueError("job file is None")
+
+        params = dict(MarkerPrinter.batchJobDefaults)
+        for key, value in job.items():
+            if(key in ("type", "file")):
+                continue
+            if not(key in params):
+                raise ValueError("job parameter is not supported: " + str(key))
+            params[key] = value
+
+        chessboardSize = (int(params["size_x"]), int(params["size_y"]))
+        subSize = MarkerPrinter.SubSize(chessboardSize, int(params["sub_size_x"]), int(params["sub_size_y"]))
+        pageBorder = (float(params["page_border_x"]), float(params["page_border_y"]))
+        tilesOnly = str(params["tiles_only"]).lower() in ("1", "true", "yes")
+        subPages = str(params["sub_pages"]).lower() in ("1", "true", "yes")
+        dpi = float(params["dpi"])
+
+        if(jobType == "chess"):
+            MarkerPrinter.GenChessMarkerImage(filePath, chessboardSize, float(params["square_length"]),
+                subSize = subSize, pageBorder = pageBorder, tilesOnly = tilesOnly, subPages = subPages, dpi = dpi)
+
+        elif(jobType == "aruco"):
+            MarkerPrinter.GenArucoMarkerImage(filePath, params["dictionary"], int(params["marker_id"]), float(params["marker_length"]),
+                borderBits = int(params["border_bits"]), pageBorder = pageBorder, dpi = dpi)
+
+        elif(jobType == "aruco_grid"):
+            MarkerPrinter.GenArucoGridMarkerImage(filePath, params["dictionary"], chessboardSize, float(params["marker_length"]), float(params["marker_separation"]), int(params["first_marker"]),
+                borderBits = int(params["border_bits"]), subSize = subSize, pageBorder = pageBorder, tilesOnly = tilesOnly, subPages = subPages, dpi = dpi)
+
+        elif(jobType == "charuco"):
+            MarkerPrinter.GenCharucoMarkerImage(filePath, params["dictionary"], chessboardSize, float(params["square_length"]), float(params["marker_length"]),
+                borderBits = int(params["border_bits"]), subSize = subSize, pageBorder = pageBorder, tilesOnly = tilesOnly, subPages = subPages, dpi = dpi)
+
+        else:
+            raise ValueError("job type is not supported, should be: chess, aruco, aruco_grid, charuco")
+
+    def TimeBatchJob(job):
+        error = None
+        start = time.perf_counter()
+        try:
+            MarkerPrinter.RunBatchJob(job)
+        except Exception as e:
+            error = str(e)
+        return time.perf_counter() - start, error
+
+    def GenBatch(manifest, jobs=1):
+        # With jobs 1 every job runs in this process, so the dictionaries and the glyph cache are shared between them
+        timings = MarkerPrinter.RunParallel(MarkerPrinter.TimeBatchJob, [(job,) for job in manifest], jobs)
+
+        results = []
+        for jobID, (job, (seconds, error)) in enumerate(zip(manifest, timings)):
+            if(error is not None):
+                warnings.warn("job " + str(jobID) + " failed: " + error)
+
+            results.append({
+                "job": jobID,
+                "type": job.get("type", None),
+                "file": job.get("file", None),
+                "seconds": seconds,
+                "error": error })
+
+        return results
+
+    def PrintBatchSummary(results):
+        print("job  type        seconds   status  file")
+        for result in results:
+            print("%-4d %-11s %9.4f  %-6s  %s" % (
+                result["job"], str(result["type"]), result["seconds"],
+                "ok" if (result["error"] is None) else "failed", str(result["file"])))
+
+        failed = [result for result in results if result["error"] is not None]
+        print("%d jobs, %d failed, %.4f seconds" % (len(results), len(failed), sum(result["seconds"] for result in results)))
+
+    def PrintTiles(tiles):
+        for tile in tiles:
+            if(tile["page"] is None):
+                print(tile["tile"] + ": " + tile["file"])
+            else:
+                print(tile["tile"] + ": " + tile["file"] + " page " + str(tile["page"]))
+
+    def PrintCacheStats():
+        print("dictionary cache: " + str(MarkerPrinter.arucoDictBytesList.Stats()))
+        print("glyph cache: " + str(MarkerPrinter.glyphCache.Stats()))
+        if(MarkerPrinter.outputCache is not None):
+            print("output cache: " + str(MarkerPrinter.outputCache.Stats()))
+
+    def PrintProfile(stats, outputFormat = "table"):
+        if(outputFormat.upper() == "JSON"):
+            print(json.dumps(stats, indent = 1))
+            return
+
+        print("stage".ljust(12) + "seconds".rjust(12) + "share".rjust(8) + "calls".rjust(10) + "bytes".rjust(12))
+        for stat in stats["stages"]:
+            share = (stat["seconds"] / stats["seconds"]) if (stats["seconds"] > 0) else 0.0
+            print(stat["stage"].ljust(12) + ("%.6f" % stat["seconds"]).rjust(12) + ("%.1f%%" % (share * 100)).rjust(8) + str(stat["calls"]).rjust(10) + str(stat["bytes"]).rjust(12))
+        print("total".ljust(12) + ("%.6f" % stats["seconds"]).rjust(12))
 
 if __name__ == '__main__':
+    from argparse import ArgumentParser
+
     parser = ArgumentParser()
 
     # Save marker image parameters
@@ -996,15 +2529,27 @@ if __name__ == '__main__':
         "--charuco", action='store_true', default=False,
         help="Choose to save ChArUco marker")
 
+    exclusiveGroup.add_argument(
+        "--aruco_sheet", action='store_true', default=False,
+        help="Choose to save ArUco markers of --marker_id on pages of one file")
+
     # Utility functions parameters
     exclusiveGroup.add_argument(
-        "--generate", dest="arucoDataFileName",
-        help="Generate aruco data to FILE", metavar="FILE")
+        "--generate", dest="arucoDataFileName", nargs="?", const=MarkerPrinter.arucoDictBytesList.filePath,
+        help="Generate aruco data to FILE (Default: arucoDictBytesList.npz next to MarkerPrinter.py, the file that is loaded)", metavar="FILE")
+
+    exclusiveGroup.add_argument(
+        "--generate_bits", dest="arucoBitsDirName", nargs="?", const=MarkerPrinter.arucoDictBitsList.dirPath,
+        help="Generate memory-mappable aruco bit planes to DIR from the aruco data (Default: arucoDictBitsList next to MarkerPrinter.py, the folder that is loaded)", metavar="DIR")
 
     exclusiveGroup.add_argument(
         "--list_dictionary", action='store_true', default=False,
         help="List predefined aruco dictionary")
 
+    exclusiveGroup.add_argument(
+        "--batch", dest="batchFileName",
+        help="Save every job of the JSON or CSV manifest FILE", metavar="FILE")
+
     # Parameters
     # fileName
     parser.add_argument(
@@ -1124,18 +2669,123 @@ if __name__ == '__main__':
             "--" + group.title + "_page_border_y", dest="pageBorderY", default="0",
             help="Save with page border height L length (Unit: meter)", metavar="L")
 
+    # vector backend
+    parser.add_argument(
+        "--vector_backend", dest="vectorBackend", default=None,
+        help="Write svg, pdf and ps files with BACKEND: CAIRO, NATIVE (Default: CAIRO)", metavar="BACKEND")
+
+    # raster
+    parser.add_argument(
+        "--dpi", dest="dpi", default="300",
+        help="Save png and tiff files with N dots per inch", metavar="N")
+
+    # output cache
+    parser.add_argument(
+        "--cache", dest="cacheDirName", default=None,
+        help="Reuse the files saved with the same parameters, stored in the DIR folder", metavar="DIR")
+    parser.add_argument(
+        "--cache_size", dest="cacheSize", default="1024",
+        help="Keep at most MB megabytes in the cache, least recently used first out (Default: 1024)", metavar="MB")
+    parser.add_argument(
+        "--cache_link", action='store_true', default=False,
+        help="Hard link the cached files instead of copying them, they must not be modified in place")
+    parser.add_argument(
+        "--creation_date", dest="creationDate", default=None,
+        help="Write DATE as the creation date of pdf and ps files saved by cairo, such as 2019-01-01T00:00:00Z (Default: SOURCE_DATE_EPOCH or now)", metavar="DATE")
+
+    # sheet
+    parser.add_argument(
+        "--paper_size_x", dest="paperSizeX", default="0.210",
+        help="Save sheet with L paper width (Unit: meter)", metavar="L")
+    parser.add_argument(
+        "--paper_size_y", dest="paperSizeY", default="0.297",
+        help="Save sheet with L paper height (Unit: meter)", metavar="L")
+    parser.add_argument(
+        "--margin_x", dest="marginX", default="0.01",
+        help="Save sheet with L paper margin width (Unit: meter)", metavar="L")
+    parser.add_argument(
+        "--margin_y", dest="marginY", default="0.01",
+        help="Save sheet with L paper margin height (Unit: meter)", metavar="L")
+
+    # tiles only
+    parser.add_argument(
+        "--tiles_only", action='store_true', default=False,
+        help="Save only the chunks of --sub_size_x and --sub_size_y, without the full marker image")
+
+    # sub pages
+    parser.add_argument(
+        "--sub_pages", action='store_true', default=False,
+        help="Save the chunks as pages of one pdf or ps file, named with _tiles")
+
+    # profile
+    parser.add_argument(
+        "--profile", dest="profile", nargs="?", const="table", default=None,
+        help="Print the time, calls and bytes written of every stage as FORMAT: table, json (Default: table)", metavar="FORMAT")
+
+    # jobs
+    parser.add_argument(
+        "--jobs", dest="jobs", default="1",
+        help="Save tiles, markers and batch jobs with N processes, 0 uses every core", metavar="N")
+
     # Run
     args = parser.parse_args()
 
+    if(args.vectorBackend is not None):
+        if not(args.vectorBackend.upper() in ("CAIRO", "NATIVE")):
+            parser.error("vector backend is not supported, should be: CAIRO, NATIVE")
+        for ext in MarkerPrinter.vectorBackend:
+            MarkerPrinter.vectorBackend[ext] = args.vectorBackend.upper()
+
+    if(args.creationDate is not None):
+        MarkerPrinter.creationDate = args.creationDate
+
+    if(args.cacheDirName is not None):
+        try:
+            MarkerPrinter.outputCache = OutputCache(args.cacheDirName, capacity = int(float(args.cacheSize) * 1024 * 1024), hardLink = args.cache_link)
+        except ValueError as e:
+            parser.error(str(e))
+
+    profiler = None
+    if(args.profile is not None):
+        if not(args.profile.upper() in ("TABLE", "JSON")):
+            parser.error("profile format is not supported, should be: table, json")
+        profiler = Profiler()
+        profiler.Start()
+    exitCode = 0
+
     if(args.arucoDataFileName is not None):
         print("Generate aruco data to: " + args.arucoDataFileName)
         SaveArucoDictBytesList(args.arucoDataFileName)
+        if(os.path.isdir(MarkerPrinter.arucoDictBitsList.dirPath)):
+            print("The aruco bit planes of " + MarkerPrinter.arucoDictBitsList.dirPath + " are not updated, generate them again with --generate_bits")
+
+    elif(args.arucoBitsDirName is not None):
+        print("Generate aruco bit planes to: " + args.arucoBitsDirName)
+        SaveArucoDictBitsList(args.arucoBitsDirName)
+        if(os.path.abspath(args.arucoBitsDirName) != os.path.abspath(MarkerPrinter.arucoDictBitsList.dirPath)):
+            print("Only " + MarkerPrinter.arucoDictBitsList.dirPath + " is loaded, set MarkerPrinter.arucoDictBitsList.dirPath to use " + args.arucoBitsDirName)
 
     elif(args.list_dictionary):
         print("List predefined aruco dictionary")
         for i in MarkerPrinter.arucoDictBytesList.keys():
             print(i)
 
+    elif(args.batchFileName is not None):
+        try:
+            manifest = MarkerPrinter.LoadBatchManifest(args.batchFileName)
+            jobs = int(args.jobs)
+        except Exception as e:
+            warnings.warn(str(e))
+        else:
+            print("Save " + str(len(manifest)) + " jobs of: " + args.batchFileName)
+            results = MarkerPrinter.GenBatch(manifest, jobs=jobs)
+            MarkerPrinter.PrintBatchSummary(results)
+            if(jobs == 1):
+                MarkerPrinter.PrintCacheStats()
+
+            if(any(result["error"] is not None for result in results)):
+                exitCode = 1
+
     elif(args.chess):
         try:
             sizeX = int(args.sizeX)
@@ -1145,6 +2795,8 @@ if __name__ == '__main__':
             subSizeY = int(args.subSizeY)
             pageBorderX = float(args.pageBorderX)
             pageBorderY = float(args.pageBorderY)
+            jobs = int(args.jobs)
+            dpi = float(args.dpi)
         except ValueError as e:
             warnings.warn(str(e))
         else:
@@ -1160,29 +2812,21 @@ if __name__ == '__main__':
                         "pageBorderY": pageBorderY, \
                     }))
 
-            subSize = None
-
-            if(subSizeX > 0):
-                if(subSizeY > 0):
-                    subSize = (subSizeX, subSizeY)
-                else:
-                    subSize = (subSizeX, sizeY)
-            else:
-                if(subSizeY > 0):
-                    subSize = (sizeX, subSizeY)
-                else:
-                    subSize = None
+            subSize = MarkerPrinter.SubSize((sizeX, sizeY), subSizeX, subSizeY)
 
             # Gen
-            MarkerPrinter.GenChessMarkerImage(args.fileName, (sizeX, sizeY), squareLength, subSize = subSize, pageBorder = (pageBorderX, pageBorderY))
+            tiles = MarkerPrinter.GenChessMarkerImage(args.fileName, (sizeX, sizeY), squareLength, subSize = subSize, pageBorder = (pageBorderX, pageBorderY), jobs = jobs, tilesOnly = args.tiles_only, subPages = args.sub_pages, dpi = dpi)
+            MarkerPrinter.PrintTiles(tiles)
 
     elif(args.aruco):
         try:
             markerLength = float(args.markerLength)
-            markerID = int(args.markerID)
+            markerIDs = MarkerPrinter.ParseMarkerIDs(args.markerID)
             borderBits = int(args.borderBits)
             pageBorderX = float(args.pageBorderX)
             pageBorderY = float(args.pageBorderY)
+            jobs = int(args.jobs)
+            dpi = float(args.dpi)
         except ValueError as e:
             warnings.warn(str(e))
         else:
@@ -1191,14 +2835,17 @@ if __name__ == '__main__':
                         "fileName": args.fileName, \
                         "dictionary": args.dictionary, \
                         "markerLength": markerLength, \
-                        "markerID": markerID, \
+                        "markerID": markerIDs[0] if (len(markerIDs) == 1) else markerIDs, \
                         "borderBits": borderBits, \
                         "pageBorderX": pageBorderX, \
                         "pageBorderY": pageBorderY, \
                     }))
 
             # Gen
-            MarkerPrinter.GenArucoMarkerImage(args.fileName, args.dictionary, markerID, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY))
+            if(len(markerIDs) == 1):
+                MarkerPrinter.GenArucoMarkerImage(args.fileName, args.dictionary, markerIDs[0], markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi = dpi)
+            else:
+                MarkerPrinter.GenArucoMarkerImages(args.fileName, args.dictionary, markerIDs, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), jobs = jobs, dpi = dpi)
 
     elif(args.aruco_grid):
         try:
@@ -1212,6 +2859,8 @@ if __name__ == '__main__':
             subSizeY = int(args.subSizeY)
             pageBorderX = float(args.pageBorderX)
             pageBorderY = float(args.pageBorderY)
+            jobs = int(args.jobs)
+            dpi = float(args.dpi)
         except ValueError as e:
             warnings.warn(str(e))
         else:
@@ -1231,21 +2880,11 @@ if __name__ == '__main__':
                         "pageBorderY": pageBorderY, \
                     }))
 
-            subSize = None
-
-            if(subSizeX > 0):
-                if(subSizeY > 0):
-                    subSize = (subSizeX, subSizeY)
-                else:
-                    subSize = (subSizeX, sizeY)
-            else:
-                if(subSizeY > 0):
-                    subSize = (sizeX, subSizeY)
-                else:
-                    subSize = None
+            subSize = MarkerPrinter.SubSize((sizeX, sizeY), subSizeX, subSizeY)
 
             # Gen
-            MarkerPrinter.GenArucoGridMarkerImage(args.fileName, args.dictionary, (sizeX, sizeY), markerLength, markerSeparation, firstMarker, borderBits=borderBits, subSize=subSize, pageBorder = (pageBorderX, pageBorderY))
+            tiles = MarkerPrinter.GenArucoGridMarkerImage(args.fileName, args.dictionary, (sizeX, sizeY), markerLength, markerSeparation, firstMarker, borderBits=borderBits, subSize=subSize, pageBorder = (pageBorderX, pageBorderY), jobs = jobs, tilesOnly = args.tiles_only, subPages = args.sub_pages, dpi = dpi)
+            MarkerPrinter.PrintTiles(tiles)
 
     elif(args.charuco):
         try:
@@ -1258,6 +2897,8 @@ if __name__ == '__main__':
             subSizeY = int(args.subSizeY)
             pageBorderX = float(args.pageBorderX)
             pageBorderY = float(args.pageBorderY)
+            jobs = int(args.jobs)
+            dpi = float(args.dpi)
         except ValueError as e:
             warnings.warn(str(e))
         else:
@@ -1276,21 +2917,50 @@ if __name__ == '__main__':
                         "pageBorderY": pageBorderY, \
                     }))
 
-            subSize = None
+            subSize = MarkerPrinter.SubSize((sizeX, sizeY), subSizeX, subSizeY)
 
-            if(subSizeX > 0):
-                if(subSizeY > 0):
-                    subSize = (subSizeX, subSizeY)
-                else:
-                    subSize = (subSizeX, sizeY)
-            else:
-                if(subSizeY > 0):
-                    subSize = (sizeX, subSizeY)
-                else:
-                    subSize = None
+            # Gen
+            tiles = MarkerPrinter.GenCharucoMarkerImage(args.fileName, args.dictionary, (sizeX, sizeY), squareLength, markerLength, borderBits=borderBits, subSize=subSize, pageBorder = (pageBorderX, pageBorderY), jobs = jobs, tilesOnly = args.tiles_only, subPages = args.sub_pages, dpi = dpi)
+            MarkerPrinter.PrintTiles(tiles)
+
+    elif(args.aruco_sheet):
+        try:
+            markerLength = float(args.markerLength)
+            markerSeparation = float(args.markerSeparation)
+            markerIDs = MarkerPrinter.ParseMarkerIDs(args.markerID)
+            borderBits = int(args.borderBits)
+            paperSizeX = float(args.paperSizeX)
+            paperSizeY = float(args.paperSizeY)
+            marginX = float(args.marginX)
+            marginY = float(args.marginY)
+        except ValueError as e:
+            warnings.warn(str(e))
+        else:
+            print("Save ArUco sheet with parms: " + \
+                    str({ \
+                        "fileName": args.fileName, \
+                        "dictionary": args.dictionary, \
+                        "markerLength": markerLength, \
+                        "markerSeparation": markerSeparation, \
+                        "markerID": markerIDs, \
+                        "borderBits": borderBits, \
+                        "paperSizeX": paperSizeX, \
+                        "paperSizeY": paperSizeY, \
+                        "marginX": marginX, \
+                        "marginY": marginY, \
+                    }))
 
             # Gen
-            MarkerPrinter.GenCharucoMarkerImage(args.fileName, args.dictionary, (sizeX, sizeY), squareLength, markerLength, borderBits=borderBits, subSize=subSize, pageBorder = (pageBorderX, pageBorderY))
+            pages = MarkerPrinter.GenArucoMarkerSheet(args.fileName, args.dictionary, markerIDs, markerLength, markerSeparation, borderBits=borderBits, paperSize=(paperSizeX, paperSizeY), margin=(marginX, marginY))
+            for page in pages:
+                print("page " + str(page["page"]) + ": " + str(page["markerIDs"]))
 
     else:
         parser.print_help()
+
+    if(profiler is not None):
+        profiler.Stop()
+        MarkerPrinter.PrintProfile(profiler.Stats(), args.profile)
+
+    if(exitCode != 0):
+        sys.exit(exitCode)
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Copyright (c) 2019, Josh Chien. All rights reserved.
+
+from MarkerPrinter import *
+
+from argparse import ArgumentParser
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+class MarkerPrinterBenchmark:
+
+    edgeDictionaries = ["DICT_4X4_1000", "DICT_5X5_1000", "DICT_6X6_1000", "DICT_7X7_1000"]
+    edgeBorderBits = [1, 2, 3]
+
+    def LoopMarkerEdges(markerBitMap, borderBits = 1):
+        # Reference: the per element loops MarkerPrinter.MarkerEdges replaced
+        markerSize = markerBitMap.shape[0] - borderBits * 2
+
+        hEdges = np.zeros(shape = (markerSize+1,markerSize+1), dtype = bool)
+        vEdges = np.zeros(shape = (markerSize+1,markerSize+1), dtype = bool)
+
+        for mx in range(markerSize):
+            for my in range(markerSize+1):
+                if ( markerBitMap[mx + borderBits, my + borderBits - 1] ^ markerBitMap[mx + borderBits, my + borderBits]):
+                    hEdges[mx, my] = True
+
+        for mx in range(markerSize+1):
+            for my in range(markerSize):
+                if ( markerBitMap[mx + borderBits - 1, my + borderBits] ^ markerBitMap[mx + borderBits, my + borderBits]):
+                    vEdges[mx, my] = True
+
+        return hEdges, vEdges
+
+    def MarkerBitMaps(dictionary, borderBits, markerCount):
+        return [MarkerPrinter.MarkerBitMap(dictionary, markerID, borderBits) for markerID in range(markerCount)]
+
+    def PerCall(function, markerBitMaps, borderBits, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for markerBitMap in markerBitMaps:
+                function(markerBitMap, borderBits)
+            elapsed = (time.perf_counter() - start) / len(markerBitMaps)
+            if((best is None) or (elapsed < best)):
+                best = elapsed
+        return best
+
+    def BenchmarkMarkerEdges(dictionaries = None, borderBitsList = None, markerCount = 200, repeat = 5):
+        if(dictionaries is None):
+            dictionaries = MarkerPrinterBenchmark.edgeDictionaries
+
+        if(borderBitsList is None):
+            borderBitsList = MarkerPrinterBenchmark.edgeBorderBits
+
+        results = []
+        for dictionary in dictionaries:
+            for borderBits in borderBitsList:
+                markerBitMaps = MarkerPrinterBenchmark.MarkerBitMaps(dictionary, borderBits, markerCount)
+
+                for markerBitMap in markerBitMaps:
+                    loopEdges = MarkerPrinterBenchmark.LoopMarkerEdges(markerBitMap, borderBits)
+                    edges = MarkerPrinter.MarkerEdges(markerBitMap, borderBits)
+                    if not((loopEdges[0] == edges[0]).all() and (loopEdges[1] == edges[1]).all()):
+                        raise ValueError("MarkerEdges differs from the reference loops")
+
+                loopTime = MarkerPrinterBenchmark.PerCall(MarkerPrinterBenchmark.LoopMarkerEdges, markerBitMaps, borderBits, repeat)
+                edgesTime = MarkerPrinterBenchmark.PerCall(MarkerPrinter.MarkerEdges, markerBitMaps, borderBits, repeat)
+                results.append({
+                    "dictionary": dictionary,
+                    "borderBits": borderBits,
+                    "loopUs": loopTime * 1e6,
+                    "vectorizedUs": edgesTime * 1e6,
+                    "speedup": loopTime / edgesTime })
+        return results
+
+    # Modules that importing MarkerPrinter must not load
+    importHeavyModules = ["numpy", "cairo", "cairosvg", "PIL", "cv2", "concurrent.futures", "tempfile", "argparse"]
+
+    importScript = \
+        "import sys, time\n" \
+        "sys.path.insert(0, sys.argv[1])\n" \
+        "start = time.perf_counter()\n" \
+        "import MarkerPrinter\n" \
+        "elapsed = time.perf_counter() - start\n" \
+        "print(elapsed)\n" \
+        "print(','.join(m for m in sys.argv[2].split(',') if m in sys.modules))\n"
+
+    def BenchmarkImport(repeat = 5):
+        # Fresh interpreters outside the module folder, the first run also writes the bytecode cache
+        env = dict(os.environ)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+        best = None
+        heavyModules = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", MarkerPrinterBenchmark.importScript, moduleDir, ",".join(MarkerPrinterBenchmark.importHeavyModules)],
+                cwd = tempfile.gettempdir(), env = env, check = True, capture_output = True, text = True).stdout.split("\n")
+            elapsed = float(output[0])
+            if((best is None) or (elapsed < best)):
+                best = elapsed
+            heavyModules = [m for m in output[1].split(",") if m]
+
+        return [{
+            "importMs": best * 1e3,
+            "heavyModules": " ".join(heavyModules) if heavyModules else "-" }]
+
+    # Suite matrix, the quick matrix keeps the first entry of every list
+    suiteDictionaries = ["DICT_4X4_1000", "DICT_6X6_1000", "DICT_ARUCO_ORIGINAL"]
+    suiteBoardSizes = [(5, 7), (16, 9), (40, 25)]
+    suiteDPIs = [48, 96]
+    suiteFormats = [".svg", ".pdf", ".ps"]
+    suiteBoardModes = ["CHESS", "ARUCO", "ARUCOGRID", "CHARUCO"]
+    suiteDebugModes = [None, "LINE", "BLOCK"]
+    suiteSquareLength = 0.03
+    suiteMarkerLength = 0.02
+    suiteMarkerSeparation = 0.01
+
+    def Measure(run, repeat, count = 1):
+        # The first run traces the peak of Python allocations and warms the caches, the next runs are timed
+        # Returns the best time per call, the peak and the best time of the whole run
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            if((best is None) or (elapsed < best)):
+                best = elapsed
+        return best / count, peak, best
+
+    def ArucoBitsCases(dictionaries, markerCount):
+        cases = []
+        for dictionary in dictionaries:
+            markerIDs = range(min(markerCount, MarkerPrinter.arucoDictBitsList.MarkerCount(dictionary)))
+            def Run(dictionary = dictionary, markerIDs = markerIDs):
+                for markerID in markerIDs:
+                    MarkerPrinter.ArucoBits(dictionary, markerID)
+            cases.append(("ArucoBits/" + dictionary, Run, len(markerIDs), None))
+        return cases
+
+    def DrawBlockCases(dictionaries, boardModes, debugModes, markerCount):
+        # Every block of a board laid out and drawn on its own, onto an image surface of one block
+        board = getattr(MarkerPrinter, "_MarkerPrinter__Board")
+        blockItems = getattr(MarkerPrinter, "_MarkerPrinter__BlockItems")
+        drawSquares = getattr(MarkerPrinter, "_MarkerPrinter__DrawSquares")
+        drawItems = getattr(MarkerPrinter, "_MarkerPrinter__DrawItems")
+        cellLength = 4
+
+        def Boards(mode, dictionary):
+            # One row of blocks, with markerCount markers or chess squares
+            markerLength = (MarkerPrinter.arucoDictMarkerSize[dictionary] + 2) * cellLength
+            count = min(markerCount, MarkerPrinter.arucoDictBitsList.MarkerCount(dictionary))
+            squareLength = markerLength * MarkerPrinterBenchmark.suiteSquareLength / MarkerPrinterBenchmark.suiteMarkerLength
+            separation = markerLength * MarkerPrinterBenchmark.suiteMarkerSeparation / MarkerPrinterBenchmark.suiteMarkerLength
+            if(mode == "CHESS"):
+                return [board("CHESS", (count * 2, 1), squareLength, (count * 2 * squareLength, squareLength), (0, 0))]
+            elif(mode == "ARUCO"):
+                return [board("ARUCO", (1, 1), markerLength, (markerLength, markerLength), (0, 0),
+                    dictionary = dictionary, markerLength = markerLength, firstMarkerID = markerID) for markerID in range(count)]
+            elif(mode == "ARUCOGRID"):
+                return [board("ARUCOGRID", (count, 1), markerLength + separation, (count * (markerLength + separation), markerLength), (0, 0),
+                    dictionary = dictionary, markerLength = markerLength, separation = separation)]
+            elif(mode == "CHARUCO"):
+                return [board("CHARUCO", (count * 2, 1), squareLength, (count * 2 * squareLength, squareLength), (0, 0),
+                    dictionary = dictionary, markerLength = markerLength)]
+            raise ValueError("mode is not supported: " + str(mode))
+
+        def Blocks(boards):
+            blocks = []
+            for blockBoard in boards:
+                (blockX0, blockX1), (blockY0, blockY1) = blockBoard["blockRange"]
+                for bx in range(blockX0, blockX1):
+                    for by in range(blockY0, blockY1):
+                        blocks.append((blockBoard, dict(blockBoard, blockRange = ((bx, bx + 1), (by, by + 1))), bx, by))
+            return blocks
+
+        cases = []
+        for mode in boardModes:
+            # Chess squares do not depend on the dictionary nor the debug mode
+            for debugMode in ([None] if (mode == "CHESS") else debugModes):
+                for dictionary in (dictionaries[:1] if (mode == "CHESS") else dictionaries):
+                    blocks = Blocks(Boards(mode, dictionary))
+                    blockLength = int(math.ceil(blocks[0][0]["squareLength"]))
+                    def Run(blocks = blocks, blockLength = blockLength, debugMode = debugMode):
+                        previousMode, MarkerPrinter.debugMode = MarkerPrinter.debugMode, debugMode
+                        try:
+                            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, blockLength, blockLength)
+                            context = cairo.Context(surface)
+                            for blockBoard, block, bx, by in blocks:
+                                context.save()
+                                context.translate(-bx * blockBoard["squareLength"], -by * blockBoard["squareLength"])
+                                drawSquares(context, block)
+                                drawItems(context, blockItems(blockBoard, bx, by))
+                                context.restore()
+                            surface.finish()
+                        finally:
+                            MarkerPrinter.debugMode = previousMode
+                    name = "DrawBlock/" + mode + "/" + str(debugMode) + (("/" + dictionary) if (mode != "CHESS") else "")
+                    cases.append((name, Run, len(blocks), None))
+        return cases
+
+    def BoardArgs(mode, dictionary, boardSize):
+        squareLength = MarkerPrinterBenchmark.suiteSquareLength
+        markerLength = MarkerPrinterBenchmark.suiteMarkerLength
+        if(mode == "Chess"):
+            return (boardSize, squareLength)
+        elif(mode == "Aruco"):
+            return (dictionary, 0, markerLength)
+        elif(mode == "Charuco"):
+            return (dictionary, boardSize, squareLength, markerLength)
+        else:
+            return (dictionary, boardSize, markerLength, MarkerPrinterBenchmark.suiteMarkerSeparation, 0)
+
+    def BoardCaseNames(dictionaries, boardSizes):
+        # (mode, dictionary, boardSize, name), single markers have no board size and chessboards no dictionary
+        names = []
+        for mode in ["Chess", "Aruco", "Charuco", "ArucoGrid"]:
+            for dictionary in ([None] if (mode == "Chess") else dictionaries):
+                for boardSize in ([None] if (mode == "Aruco") else boardSizes):
+                    name = mode
+                    if(boardSize is not None):
+                        name = name + "/" + str(boardSize[0]) + "x" + str(boardSize[1])
+                    if(dictionary is not None):
+                        name = name + "/" + dictionary
+                    names.append((mode, dictionary, boardSize, name))
+        return names
+
+    def PreviewCases(dictionaries, boardSizes, dpis):
+        cases = []
+        for mode, dictionary, boardSize, name in MarkerPrinterBenchmark.BoardCaseNames(dictionaries, boardSizes):
+            function = getattr(MarkerPrinter, "Preview" + mode + "MarkerImage")
+            args = MarkerPrinterBenchmark.BoardArgs(mode, dictionary, boardSize)
+            for dpi in dpis:
+                def Run(function = function, args = args, dpi = dpi):
+                    function(*args, dpi = dpi)
+                cases.append(("Preview" + name + "/" + str(dpi) + "dpi", Run, 1, None))
+        return cases
+
+    def GenCases(dictionaries, boardSizes, formats, dirPath):
+        cases = []
+        for mode, dictionary, boardSize, name in MarkerPrinterBenchmark.BoardCaseNames(dictionaries, boardSizes):
+            function = getattr(MarkerPrinter, "Gen" + mode + "MarkerImage")
+            args = MarkerPrinterBenchmark.BoardArgs(mode, dictionary, boardSize)
+            for ext in formats:
+                filePath = os.path.join(dirPath, name.replace("/", "_") + ext)
+                def Run(function = function, args = args, filePath = filePath):
+                    function(filePath, *args)
+                cases.append(("Gen" + name + "/" + ext[1:], Run, 1, filePath))
+        return cases
+
+    def BenchmarkSuite(quick = False, repeat = 3, markerCount = 200, groups = None, log = None):
+        dictionaries = MarkerPrinterBenchmark.suiteDictionaries
+        boardSizes = MarkerPrinterBenchmark.suiteBoardSizes
+        dpis = MarkerPrinterBenchmark.suiteDPIs
+        if(quick):
+            dictionaries, boardSizes, dpis = dictionaries[:1], boardSizes[:1], dpis[:1]
+
+        results = []
+        with tempfile.TemporaryDirectory() as dirPath:
+            cases = []
+            if((groups is None) or ("ArucoBits" in groups)):
+                cases = cases + MarkerPrinterBenchmark.ArucoBitsCases(dictionaries, markerCount)
+            if((groups is None) or ("DrawBlock" in groups)):
+                cases = cases + MarkerPrinterBenchmark.DrawBlockCases(dictionaries, MarkerPrinterBenchmark.suiteBoardModes, MarkerPrinterBenchmark.suiteDebugModes, markerCount)
+            if((groups is None) or ("Preview" in groups)):
+                cases = cases + MarkerPrinterBenchmark.PreviewCases(dictionaries, boardSizes, dpis)
+            if((groups is None) or ("Gen" in groups)):
+                cases = cases + MarkerPrinterBenchmark.GenCases(dictionaries, boardSizes, MarkerPrinterBenchmark.suiteFormats, dirPath)
+
+            for name, run, count, filePath in cases:
+                seconds, peakBytes, totalSeconds = MarkerPrinterBenchmark.Measure(run, repeat, count)
+                result = {
+                    "name": name,
+                    "seconds": seconds,
+                    "totalSeconds": totalSeconds,
+                    "peakBytes": peakBytes,
+                    "fileBytes": None if (filePath is None) else os.path.getsize(filePath) }
+                results.append(result)
+                if(log is not None):
+                    log(result)
+
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "vectorBackend": dict(MarkerPrinter.vectorBackend),
+            "previewBackend": MarkerPrinter.previewBackend,
+            "repeat": repeat,
+            "results": results }
+
+    def SaveResults(filePath, run):
+        with open(filePath, "w") as file:
+            json.dump(run, file, indent = 1)
+
+    def LoadResults(filePath):
+        with open(filePath) as file:
+            run = json.load(file)
+        if not(isinstance(run, dict) and isinstance(run.get("results", None), list)):
+            raise ValueError("not a benchmark result file: " + filePath)
+        return run
+
+    def Compare(baseRun, newRun, threshold = 0.1, minSeconds = 0.001, minPeakBytes = 65536):
+        # A metric regresses when it grows by more than threshold, and by more than the noise floor for times and peaks
+        # The time floor applies to the time of the whole case run, not to the time per call
+        # Cases missing from either run are skipped
+        noiseFloor = {"seconds": minSeconds, "peakBytes": minPeakBytes, "fileBytes": 0}
+        baseResults = {result["name"]: result for result in baseRun["results"]}
+        rows = []
+        for result in newRun["results"]:
+            base = baseResults.get(result["name"], None)
+            if(base is None):
+                continue
+            for metric in ["seconds", "peakBytes", "fileBytes"]:
+                if((base.get(metric, None) is None) or (result.get(metric, None) is None)):
+                    continue
+                ratio = (result[metric] / base[metric]) if (base[metric] > 0) else 1.0
+                if((metric == "seconds") and ("totalSeconds" in base) and ("totalSeconds" in result)):
+                    significant = abs(result["totalSeconds"] - base["totalSeconds"]) > noiseFloor[metric]
+                else:
+                    significant = abs(result[metric] - base[metric]) > noiseFloor[metric]
+                rows.append({
+                    "name": result["name"],
+                    "metric": metric,
+                    "base": base[metric],
+                    "new": result[metric],
+                    "ratio": ratio,
+                    "flag": "" if not(significant) else ("REGRESSION" if (ratio > 1.0 + threshold) else ("faster" if ((metric == "seconds") and (ratio < 1.0 - threshold)) else "")) })
+        return rows
+
+    def CheckProfileJobs():
+        # Tiles are saved by worker processes while the profiler wraps SaveBoardPages
+        with tempfile.TemporaryDirectory() as dirPath:
+            try:
+                with Profiler():
+                    MarkerPrinter.GenCharucoMarkerImage(os.path.join(dirPath, "charuco.pdf"), "DICT_4X4_1000", (7, 7), 0.03, 0.02, subSize = (3, 3), jobs = 2)
+            except Exception as e:
+                return str(e)
+            if(len(os.listdir(dirPath)) != 10):
+                return str(len(os.listdir(dirPath))) + " files saved instead of 10"
+        return None
+
+    def CheckBitStore():
+        # With the bit store, saving boards never decompresses the bytes list
+        previous = MarkerPrinter.arucoDictBytesList, MarkerPrinter.arucoDictBitsList
+        with tempfile.TemporaryDirectory() as dirPath:
+            try:
+                bitsDirPath = os.path.join(dirPath, "arucoDictBitsList")
+                if(SaveArucoDictBitsList(dirPath = bitsDirPath) is None):
+                    return "can not generate the bit store"
+                MarkerPrinter.arucoDictBytesList = ArucoDictBytesList(previous[0].filePath)
+                MarkerPrinter.arucoDictBitsList = ArucoDictBitsList(bitsDirPath)
+
+                MarkerPrinter.GenArucoMarkerImage(os.path.join(dirPath, "aruco.svg"), "DICT_4X4_1000", 3, 0.02)
+                MarkerPrinter.GenCharucoMarkerImage(os.path.join(dirPath, "charuco.svg"), "DICT_5X5_1000", (5, 7), 0.03, 0.02)
+                MarkerPrinter.GenArucoGridMarkerImage(os.path.join(dirPath, "arucogrid.svg"), "DICT_6X6_1000", (5, 7), 0.02, 0.01, 0)
+                if(MarkerPrinter.arucoDictBytesList.misses > 0):
+                    return "bytes list decompressed: " + str(MarkerPrinter.arucoDictBytesList.Stats()["loaded"])
+            except Exception as e:
+                return str(e)
+            finally:
+                MarkerPrinter.arucoDictBytesList, MarkerPrinter.arucoDictBitsList = previous
+        return None
+
+    def RunChecks():
+        # Every check returns an error message, None when it passes
+        checks = [
+            ("ProfileJobs", MarkerPrinterBenchmark.CheckProfileJobs),
+            ("BitStore", MarkerPrinterBenchmark.CheckBitStore) ]
+        results = []
+        for name, check in checks:
+            error = check()
+            results.append({
+                "check": name,
+                "result": "ok" if (error is None) else error })
+        return results
+
+    def PrintTable(results):
+        if(len(results) == 0):
+            return
+        keys = list(results[0].keys())
+        rows = [[("%.4g" % v) if isinstance(v, float) else str(v) for v in result.values()] for result in results]
+        widths = [max(len(k), *[len(row[i]) for row in rows]) for i, k in enumerate(keys)]
+        print("  ".join(k.ljust(w) for k, w in zip(keys, widths)))
+        for row in rows:
+            print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+
+    parser.add_argument(
+        "--edges", action='store_true', default=False,
+        help="Benchmark per marker edge extraction, loops versus vectorized")
+
+    parser.add_argument(
+        "--check", action='store_true', default=False,
+        help="Run the checks of the profiler with parallel saves and of the bit store, fail if one does not pass")
+    parser.add_argument(
+        "--import_time", action='store_true', default=False,
+        help="Benchmark the import of MarkerPrinter, fail if it loads a heavy dependency or takes more than --max_import_ms")
+    parser.add_argument(
+        "--max_import_ms", dest="maxImportMs", default=None,
+        help="Fail the import benchmark above MS milliseconds", metavar="MS")
+
+    parser.add_argument(
+        "--suite", action='store_true', default=False,
+        help="Benchmark ArucoBits, block drawing, the Preview and the Gen functions over board sizes, dictionaries, dpis and formats")
+    parser.add_argument(
+        "--quick", action='store_true', default=False,
+        help="Run the suite on the first board size, dictionary and dpi only")
+    parser.add_argument(
+        "--group", dest="groups", action='append', default=None,
+        help="Run only the GROUP cases of the suite: ArucoBits, DrawBlock, Preview, Gen", metavar="GROUP")
+    parser.add_argument(
+        "--output", dest="output", default=None,
+        help="Save the suite results to a JSON file", metavar="FILE")
+
+    parser.add_argument(
+        "--vector_backend", dest="vectorBackend", default=None,
+        help="Write the svg, pdf and ps files of the suite with BACKEND: CAIRO, NATIVE", metavar="BACKEND")
+
+    parser.add_argument(
+        "--compare", dest="compare", nargs=2, default=None,
+        help="Compare two JSON result files, fail on regressions", metavar=("BASE", "NEW"))
+    parser.add_argument(
+        "--threshold", dest="threshold", default="0.1",
+        help="Flag a metric as a regression when it grows by more than RATIO (Default: 0.1)", metavar="RATIO")
+    parser.add_argument(
+        "--min_seconds", dest="minSeconds", default="0.001",
+        help="Ignore time differences below S seconds (Default: 0.001)", metavar="S")
+
+    parser.add_argument(
+        "--marker_count", dest="markerCount", default="200",
+        help="Use N markers of each dictionary", metavar="N")
+    parser.add_argument(
+        "--repeat", dest="repeat", default=None,
+        help="Keep the best of N runs (Default: 5, 3 for the suite)", metavar="N")
+
+    args = parser.parse_args()
+
+    if(args.edges):
+        MarkerPrinterBenchmark.PrintTable(MarkerPrinterBenchmark.BenchmarkMarkerEdges(
+            markerCount = int(args.markerCount), repeat = int(args.repeat or 5)))
+
+    elif(args.suite):
+        if(args.vectorBackend is not None):
+            if not(args.vectorBackend.upper() in ("CAIRO", "NATIVE")):
+                parser.error("vector backend is not supported, should be: CAIRO, NATIVE")
+            for ext in MarkerPrinter.vectorBackend:
+                MarkerPrinter.vectorBackend[ext] = args.vectorBackend.upper()
+
+        def Log(result):
+            print(result["name"] + ": " + ("%.4g" % result["seconds"]) + " s")
+
+        run = MarkerPrinterBenchmark.BenchmarkSuite(
+            quick = args.quick, repeat = int(args.repeat or 3), markerCount = int(args.markerCount), groups = args.groups, log = Log)
+        if(args.output is not None):
+            MarkerPrinterBenchmark.SaveResults(args.output, run)
+            print("Save results to: " + args.output)
+
+    elif(args.compare is not None):
+        rows = MarkerPrinterBenchmark.Compare(
+            MarkerPrinterBenchmark.LoadResults(args.compare[0]), MarkerPrinterBenchmark.LoadResults(args.compare[1]),
+            threshold = float(args.threshold), minSeconds = float(args.minSeconds))
+        MarkerPrinterBenchmark.PrintTable(rows)
+        regressions = [row for row in rows if row["flag"] == "REGRESSION"]
+        if(len(regressions) > 0):
+            sys.exit(str(len(regressions)) + " regressions")
+
+    elif(args.check):
+        if(args.vectorBackend is not None):
+            if not(args.vectorBackend.upper() in ("CAIRO", "NATIVE")):
+                parser.error("vector backend is not supported, should be: CAIRO, NATIVE")
+            for ext in MarkerPrinter.vectorBackend:
+                MarkerPrinter.vectorBackend[ext] = args.vectorBackend.upper()
+
+        results = MarkerPrinterBenchmark.RunChecks()
+        MarkerPrinterBenchmark.PrintTable(results)
+        failures = [result for result in results if result["result"] != "ok"]
+        if(len(failures) > 0):
+            sys.exit(str(len(failures)) + " checks failed")
+
+    elif(args.import_time):
+        results = MarkerPrinterBenchmark.BenchmarkImport(repeat = int(args.repeat or 5))
+        MarkerPrinterBenchmark.PrintTable(results)
+        if(results[0]["heavyModules"] != "-"):
+            sys.exit("import loads: " + results[0]["heavyModules"])
+        if((args.maxImportMs is not None) and (results[0]["importMs"] > float(args.maxImportMs))):
+            sys.exit("import takes more than " + args.maxImportMs + " ms")
+
+    else:
+        parser.print_help()
@@ -9,11 +9,99 @@ from MarkerPrinter import *
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-import time
+import threading
 
 import PIL.Image
 import PIL.ImageTk
 
+class PreviewWorker:
+
+    # Renders previews on a background thread, a new request replaces the pending one and cancels the running one
+    # The finished image is picked up by the Tk thread with Take
+    # Progressive: a coarse NumPy preview at progressiveScale of the dpi is posted first, then the full resolution one
+    progressiveScale = 0.25 # None renders the full resolution only
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.request = None
+        self.generation = 0
+        self.running = False
+        self.result = None
+        self.thread = threading.Thread(target = self.Run, daemon = True)
+        self.thread.start()
+
+    def Submit(self, target, PreviewMarkerImageCallback, *args, **kwargs):
+        with self.condition:
+            self.generation = self.generation + 1
+            self.request = (self.generation, target, PreviewMarkerImageCallback, args, kwargs)
+            self.result = None
+            self.condition.notify()
+
+    def Cancel(self):
+        with self.condition:
+            self.generation = self.generation + 1
+            self.request = None
+            self.result = None
+
+    def IsStale(self, generation):
+        return generation != self.generation
+
+    def IsBusy(self):
+        with self.condition:
+            return (self.request is not None) or self.running
+
+    def Passes(self, kwargs):
+        # (kwargs, final) of every render of a request, the debug drawing has no NumPy renderer
+        passes = [(kwargs, True)]
+        if((self.progressiveScale is not None) and ("dpi" in kwargs) and (MarkerPrinter.debugMode is None)):
+            passes.insert(0, (dict(kwargs, dpi = kwargs["dpi"] * self.progressiveScale, backend = "NUMPY"), False))
+        return passes
+
+    def Render(self, PreviewMarkerImageCallback, args, kwargs, final):
+        image = PreviewMarkerImageCallback(*args, **kwargs)
+        if not(final):
+            # Scale up to about the full resolution size, so the layout does not move
+            size = (max(1, int(round(image.width / self.progressiveScale))), max(1, int(round(image.height / self.progressiveScale))))
+            image = image.resize(size, PIL.Image.NEAREST)
+        return image
+
+    def Post(self, generation, result):
+        with self.condition:
+            if not(self.IsStale(generation)):
+                self.result = result
+
+    def Run(self):
+        while(True):
+            with self.condition:
+                while(self.request is None):
+                    self.condition.wait()
+                generation, target, PreviewMarkerImageCallback, args, kwargs = self.request
+                self.request = None
+                self.running = True
+
+            MarkerPrinter.SetCancelCheck(lambda: self.IsStale(generation))
+            try:
+                for passKwargs, final in self.Passes(kwargs):
+                    try:
+                        self.Post(generation, (target, self.Render(PreviewMarkerImageCallback, args, passKwargs, final), None, final))
+                    except RenderCancelled:
+                        break
+                    except Exception as e:
+                        # The full resolution pass reports the errors
+                        if(final):
+                            self.Post(generation, (target, None, e, final))
+            finally:
+                MarkerPrinter.SetCancelCheck(None)
+
+            with self.condition:
+                self.running = False
+
+    def Take(self):
+        # (target, image, error, final) of the latest finished render, or None
+        with self.condition:
+            result, self.result = self.result, None
+            return result
+
 class MarkerPrinterGUI:
 
     def VisDPI(self, shape):
@@ -24,6 +112,40 @@ class MarkerPrinterGUI:
         else:
             return scale0 * 96.0
 
+    def PreviewKey(PreviewMarkerImageCallback, args, kwargs):
+        # Board type, every parameter (dpi included) and the global drawing modes
+        return (PreviewMarkerImageCallback.__name__, args, tuple(sorted(kwargs.items())), MarkerPrinter.debugMode, MarkerPrinter.previewBackend)
+
+    def PreviewImageSize(image):
+        return image.width * image.height * len(image.getbands())
+
+    def SubmitPreview(self, imageLabel, PreviewMarkerImageCallback, *args, **kwargs):
+        key = MarkerPrinterGUI.PreviewKey(PreviewMarkerImageCallback, args, kwargs)
+        image = self.previewCache.Get(key)
+        if(image is not None):
+            # Drop the render of an older request, it would replace this image
+            self.previewWorker.Cancel()
+            self.ShowPreview(((imageLabel, key), image, None, False))
+            return
+
+        self.previewWorker.Submit((imageLabel, key), PreviewMarkerImageCallback, *args, **kwargs)
+        self.window.config(cursor="watch")
+
+    def ShowPreview(self, result):
+        (imageLabel, key), image, error, final = result
+        if(error is not None):
+            warnings.warn(str(error))
+            messagebox.showinfo("Error", "create marker failed")
+            return
+
+        # Only full resolution renders are kept, cached images are already there
+        if(final):
+            self.previewCache.Put(key, image)
+
+        tkImage = PIL.ImageTk.PhotoImage(image = image)
+        imageLabel.imgtk = tkImage
+        imageLabel.config(image=tkImage)
+
     def OnShowingHelpGithub(self):
         messagebox.showinfo("Github",
             "https://github.com/dogod621/OpenCVMarkerPrinter")
@@ -91,12 +213,11 @@ class MarkerPrinterGUI:
             messagebox.showinfo("Error", "Fail to get parameters")
             return
 
-        # Preview
+        # Preview, rendered by the preview worker; the parameters are checked here so invalid ones stop the save too
         try:
             dpi = self.VisDPI(((sizeY * squareLength + pageBorderY * 2) * MarkerPrinter.ptPerMeter, (sizeX * squareLength + pageBorderX * 2) * MarkerPrinter.ptPerMeter))
-            tkImage = PIL.ImageTk.PhotoImage(image = MarkerPrinter.PreviewCharucoMarkerImage(dictionary, (sizeX, sizeY), squareLength, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi=dpi))
-            self.charucoMarkerImageLabel.imgtk = tkImage
-            self.charucoMarkerImageLabel.config(image=tkImage)
+            MarkerPrinter.CheckCharucoMarkerImage(dictionary, (sizeX, sizeY), squareLength, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY))
+            self.SubmitPreview(self.charucoMarkerImageLabel, MarkerPrinter.PreviewCharucoMarkerImage, dictionary, (sizeX, sizeY), squareLength, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi=dpi)
         except Exception as e:
             warnings.warn(str(e))
             messagebox.showinfo("Error", "create marker failed")
@@ -211,12 +332,11 @@ class MarkerPrinterGUI:
             messagebox.showinfo("Error", "Fail to get parameters")
             return
 
-        # Preview
+        # Preview, rendered by the preview worker; the parameters are checked here so invalid ones stop the save too
         try:
             dpi=self.VisDPI(((markersY * markerLength + (markersY  - 1) * markerSeparation + pageBorderY * 2) * MarkerPrinter.ptPerMeter, (markersX * markerLength + (markersX  - 1) * markerSeparation + pageBorderX * 2) * MarkerPrinter.ptPerMeter))
-            tkImage = PIL.ImageTk.PhotoImage(image = MarkerPrinter.PreviewArucoGridMarkerImage(dictionary, (markersX, markersY), markerLength, markerSeparation, firstMarker, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi=dpi))
-            self.arucoGridMarkerImageLabel.imgtk = tkImage
-            self.arucoGridMarkerImageLabel.config(image=tkImage)
+            MarkerPrinter.CheckArucoGridMarkerImage(dictionary, (markersX, markersY), markerLength, markerSeparation, firstMarker, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY))
+            self.SubmitPreview(self.arucoGridMarkerImageLabel, MarkerPrinter.PreviewArucoGridMarkerImage, dictionary, (markersX, markersY), markerLength, markerSeparation, firstMarker, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi=dpi)
         except Exception as e:
             warnings.warn(str(e))
             messagebox.showinfo("Error", "create marker failed")
@@ -330,12 +450,11 @@ class MarkerPrinterGUI:
             messagebox.showinfo("Error", "Fail to get parameters")
             return
 
-        # Preview
+        # Preview, rendered by the preview worker; the parameters are checked here so invalid ones stop the save too
         try:
             dpi=self.VisDPI(((markerLength  + pageBorderY * 2) * MarkerPrinter.ptPerMeter, (markerLength + pageBorderX * 2) * MarkerPrinter.ptPerMeter))
-            tkImage = PIL.ImageTk.PhotoImage(image = MarkerPrinter.PreviewArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi=dpi))
-            self.arucoMarkerImageLabel.imgtk = tkImage
-            self.arucoMarkerImageLabel.config(image=tkImage)
+            MarkerPrinter.CheckArucoMarkerImage(dictionary, markerID, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY))
+            self.SubmitPreview(self.arucoMarkerImageLabel, MarkerPrinter.PreviewArucoMarkerImage, dictionary, markerID, markerLength, borderBits=borderBits, pageBorder = (pageBorderX, pageBorderY), dpi=dpi)
         except Exception as e:
             warnings.warn(str(e))
             messagebox.showinfo("Error", "create marker failed")
@@ -425,12 +544,11 @@ class MarkerPrinterGUI:
             messagebox.showinfo("Error", "Fail to get parameters")
             return
 
-        # Preview
+        # Preview, rendered by the preview worker; the parameters are checked here so invalid ones stop the save too
         try:
             dpi=self.VisDPI(((sizeY * squareLength + pageBorderY * 2) * MarkerPrinter.ptPerMeter, (sizeX * squareLength + pageBorderX * 2) * MarkerPrinter.ptPerMeter))
-            tkImage = PIL.ImageTk.PhotoImage(image = MarkerPrinter.PreviewChessMarkerImage((sizeX, sizeY), squareLength, pageBorder = (pageBorderX, pageBorderY), dpi=dpi))
-            self.chessMarkerImageLabel.imgtk = tkImage
-            self.chessMarkerImageLabel.config(image=tkImage)
+            MarkerPrinter.CheckChessMarkerImage((sizeX, sizeY), squareLength, pageBorder = (pageBorderX, pageBorderY))
+            self.SubmitPreview(self.chessMarkerImageLabel, MarkerPrinter.PreviewChessMarkerImage, (sizeX, sizeY), squareLength, pageBorder = (pageBorderX, pageBorderY), dpi=dpi)
         except Exception as e:
             warnings.warn(str(e))
             messagebox.showinfo("Error", "create marker failed")
@@ -503,14 +621,25 @@ class MarkerPrinterGUI:
         tk.Entry(self.chessMarkerUIFrame2, textvariable=self.chessMarkerSavePageBorderYStr).grid(row=1, column=6, sticky = tk.NSEW)
 
     def Update(self):
-        time.sleep(0)
+        # Hand the finished previews over to Tk, on its own thread
+        result = self.previewWorker.Take()
+        if(result is not None):
+            self.ShowPreview(result)
+        if(self.window is None):
+            return
+        if not(self.previewWorker.IsBusy()):
+            self.window.config(cursor="arrow")
         self.window.after(self.delay, self.Update)
 
-    def __init__(self, pDelay=15, pDisplayShape=(int(400), int(1200))):
+    def __init__(self, pDelay=15, pDisplayShape=(int(400), int(1200)), pPreviewCacheSize=int(256 * 1024 * 1024)):
         self.delay = pDelay
         self.displayShape = pDisplayShape
 
+        # Rendered previews, pPreviewCacheSize is in bytes of image data
+        self.previewCache = LRUCache(capacity = pPreviewCacheSize, sizeOf = MarkerPrinterGUI.PreviewImageSize)
+
         self.dictList = MarkerPrinter.arucoDictBytesList.keys()
+        self.previewWorker = PreviewWorker()
 
         # GUI
         self.window = tk.Tk()
@@ -529,6 +658,7 @@ class MarkerPrinterGUI:
         self.helpMenu.add_command(label="DEBUG_LINE_MODE", command=self.On_DEBUG_LINE_MODE)
         self.helpMenu.add_command(label="DEBUG_BLOCK_MODE", command=self.On_DEBUG_BLOCK_MODE)
         self.helpMenu.add_command(label="CLOSE_DEBUG_MODE", command=self.On_CLOSE_DEBUG_MODE)
+        self.helpMenu.add_command(label="PREVIEW_CACHE_STATS", command=self.On_PREVIEW_CACHE_STATS)
         self.window.config(menu=self.menu)
 
         self.charucoMarkerTab = ttk.Frame(self.notebook)
@@ -561,5 +691,15 @@ class MarkerPrinterGUI:
         messagebox.showinfo("Note", "You closed the debug mode")
         MarkerPrinter.debugMode = None
 
+    def On_PREVIEW_CACHE_STATS(self):
+        stats = self.previewCache.Stats()
+        messagebox.showinfo("Preview cache",
+            "hits: " + str(stats["hits"]) + "\n" + \
+            "misses: " + str(stats["misses"]) + "\n" + \
+            "hit rate: " + ("%.1f%%" % (stats["hitRate"] * 100)) + "\n" + \
+            "entries: " + str(stats["entries"]) + "\n" + \
+            "evictions: " + str(stats["evictions"]) + "\n" + \
+            "size: " + ("%.1f" % (stats["size"] / (1024.0 * 1024.0))) + " / " + ("%.1f" % (stats["capacity"] / (1024.0 * 1024.0))) + " MB")
+
 if __name__ == '__main__':
     MarkerPrinterGUI()